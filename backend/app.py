@@ -1,43 +1,77 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, redirect, url_for
 from flask_cors import CORS
+import click
 from werkzeug.utils import secure_filename
 import os
-import threading
 from datetime import datetime
-import zipfile
-import tempfile
-import shutil
 
 from config import Config
 from models import db, Photo, Person, Face
-from face_processor_mock import FaceProcessor
+from face_processor import FaceProcessor
+from face_engines import create_engine_from_config
+from merge_suggestions import MergeSuggester
+from ingest import ingest_file, ProcessingQueue
+from chunked_upload import ChunkedUploadStore
+from importer import Importer, ImportJob
+from events import EventBus
+from stats import StatsReconciler
+from storage_gc import GarbageCollector
+from storage import create_storage
+from schema import create_schema
+from media import create_media_blueprint
+from encoding_archive import export_encodings, import_encodings
+import stats
 from utils import (
-    allowed_file, generate_unique_filename, get_image_dimensions,
-    create_thumbnail, validate_image, get_file_size, ensure_directory_exists,
-    sanitize_filename, format_file_size
+    allowed_file, generate_unique_filename, ensure_directory_exists,
+    sanitize_filename, format_file_size, encode_cursor, decode_cursor
 )
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize extensions
-CORS(app, origins=["http://localhost:3000", "https://work-1-nbzjicskggkwmgic.prod-runtime.all-hands.dev"])
+CORS(app, origins=app.config['CORS_ORIGINS'])
 db.init_app(app)
 
-# Initialize face processor
-face_processor = FaceProcessor(
-    tolerance=app.config['FACE_RECOGNITION_TOLERANCE'],
-    model=app.config['FACE_RECOGNITION_MODEL']
-)
-
-# Ensure upload directories exist
-ensure_directory_exists(app.config['UPLOAD_FOLDER'])
-ensure_directory_exists(os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails'))
-
 def create_tables():
-    """Create database tables"""
+    """Create database tables and add columns and indexes missing from older ones"""
     with app.app_context():
-        db.create_all()
+        create_schema()
+
+# Import workers are spawned processes that re-run the launching script
+# (python app.py) as __mp_main__; they must not open the database or start
+# another set of background services
+if __name__ != '__mp_main__':
+    create_tables()
+
+    # Initialize face processor
+    face_processor = FaceProcessor(
+        create_engine_from_config(app.config),
+        tolerance=app.config['FACE_RECOGNITION_TOLERANCE'],
+        min_quality=app.config['FACE_MIN_QUALITY'],
+        exemplars=app.config['FACE_PROTOTYPE_EXEMPLARS'],
+        clustering=app.config['FACE_CLUSTERING'],
+        clustering_params=app.config['FACE_CLUSTERING_PARAMS']
+    )
+    merge_suggester = MergeSuggester(face_processor.prototypes)
+    event_bus = EventBus()
+    storage = create_storage(app.config)
+    app.register_blueprint(create_media_blueprint(storage))
+    processing_queue = ProcessingQueue(app, face_processor, storage, workers=app.config['PROCESSING_WORKERS'], events=event_bus)
+    importer = Importer(app, face_processor, workers=app.config['IMPORT_WORKERS'], events=event_bus)
+    stats_reconciler = StatsReconciler(app, interval=app.config['STATS_RECONCILE_INTERVAL'])
+    garbage_collector = GarbageCollector(app, storage, interval=app.config['GC_INTERVAL'], min_age=app.config['GC_MIN_AGE'])
+    garbage_collector.start()
+
+    # Ensure upload directories exist
+    ensure_directory_exists(app.config['UPLOAD_FOLDER'])
+    ensure_directory_exists(app.config['STAGING_FOLDER'])
+    ensure_directory_exists(app.config['TEMP_FOLDER'])
+
+    chunked_uploads = ChunkedUploadStore(
+        os.path.join(app.config['UPLOAD_FOLDER'], 'incoming'),
+        chunk_size=app.config['UPLOAD_CHUNK_SIZE']
+    )
 
 # API Routes
 
@@ -58,7 +92,7 @@ def upload_photos():
             return jsonify({'error': 'No files selected'}), 400
         
         uploaded_files = []
-        processing_queue = []
+        duplicates = []
         
         for file in files:
             if file and file.filename and allowed_file(file.filename):
@@ -66,39 +100,16 @@ def upload_photos():
                     # Generate unique filename
                     original_filename = sanitize_filename(file.filename)
                     unique_filename = generate_unique_filename(original_filename)
-                    file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+                    file_path = os.path.join(app.config['STAGING_FOLDER'], unique_filename)
                     
                     # Save file
                     file.save(file_path)
                     
-                    # Validate image
-                    if not validate_image(file_path):
-                        os.remove(file_path)
-                        continue
-                    
-                    # Get image info
-                    width, height = get_image_dimensions(file_path)
-                    file_size = get_file_size(file_path)
-                    
-                    # Create thumbnail
-                    thumbnail_path = os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails', unique_filename)
-                    create_thumbnail(file_path, thumbnail_path)
-                    
-                    # Save to database
-                    photo = Photo(
-                        filename=unique_filename,
-                        original_filename=original_filename,
-                        file_path=file_path,
-                        file_size=file_size,
-                        width=width,
-                        height=height
-                    )
-                    
-                    db.session.add(photo)
-                    db.session.flush()  # Get the ID
-                    
-                    uploaded_files.append(photo.to_dict())
-                    processing_queue.append((file_path, photo.id))
+                    photo, created = ingest_file(file_path, original_filename, storage)
+                    if created:
+                        uploaded_files.append(photo)
+                    elif photo:
+                        duplicates.append(photo)
                     
                 except Exception as e:
                     print(f"Error uploading file {file.filename}: {str(e)}")
@@ -107,17 +118,16 @@ def upload_photos():
         db.session.commit()
         
         # Process faces in background
-        if processing_queue:
-            thread = threading.Thread(
-                target=process_photos_background,
-                args=(processing_queue,)
-            )
-            thread.daemon = True
-            thread.start()
+        for photo in uploaded_files:
+            processing_queue.submit(photo)
+        
+        if uploaded_files:
+            event_bus.publish('photos_uploaded', {'photo_ids': [photo.id for photo in uploaded_files]})
         
         return jsonify({
             'message': f'Successfully uploaded {len(uploaded_files)} photos',
-            'photos': uploaded_files,
+            'photos': [photo.to_dict(faces_count=0) for photo in uploaded_files],
+            'duplicates': [photo.to_dict(fields={'id', 'original_filename', 'thumbnail_url'}) for photo in duplicates],
             'processing': True
         })
         
@@ -125,36 +135,196 @@ def upload_photos():
         db.session.rollback()
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
-def process_photos_background(processing_queue):
-    """Process photos in background thread"""
-    with app.app_context():
-        for file_path, photo_id in processing_queue:
-            try:
-                face_processor.process_and_group_photo(file_path, photo_id)
-                print(f"Processed photo {photo_id}")
-            except Exception as e:
-                print(f"Error processing photo {photo_id}: {str(e)}")
+def processing_backpressure():
+    """503 response telling clients to retry later while processing is backlogged, else None"""
+    if processing_queue.backlog() >= app.config['PROCESSING_QUEUE_LIMIT']:
+        response = jsonify({'error': 'Processing backlog is full, retry later'})
+        response.headers['Retry-After'] = '10'
+        return response, 503
+    return None
 
-@app.route('/api/photos', methods=['GET'])
-def get_photos():
-    """Get all photos with pagination"""
+@app.route('/api/uploads', methods=['POST'])
+def create_chunked_upload():
+    """Start a resumable chunked upload: {filename, size, sha256?}"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        busy = processing_backpressure()
+        if busy:
+            return busy
+        
+        data = request.get_json() or {}
+        filename = data.get('filename', '')
+        size = data.get('size')
         
-        photos = Photo.query.paginate(
-            page=page, per_page=per_page, error_out=False
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        
+        if not isinstance(size, int) or size <= 0 or size > app.config['MAX_UPLOAD_FILE_SIZE']:
+            return jsonify({'error': f"Size must be between 1 and {app.config['MAX_UPLOAD_FILE_SIZE']} bytes"}), 400
+        
+        meta = chunked_uploads.create(sanitize_filename(filename), size, sha256=data.get('sha256'))
+        return jsonify(meta), 201
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Get upload status, including which chunks are still missing (for resuming)"""
+    status = chunked_uploads.status(upload_id)
+    if status is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(status)
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Upload one chunk as the raw request body (optional X-Chunk-SHA256 header)"""
+    try:
+        busy = processing_backpressure()
+        if busy:
+            return busy
+        
+        written = chunked_uploads.write_chunk(
+            upload_id, index, request.stream, sha256=request.headers.get('X-Chunk-SHA256')
         )
+        if not written:
+            return jsonify({'error': 'Upload not found'}), 404
         
-        return jsonify({
-            'photos': [photo.to_dict() for photo in photos.items],
-            'total': photos.total,
-            'pages': photos.pages,
-            'current_page': page,
-            'has_next': photos.has_next,
-            'has_prev': photos.has_prev
-        })
+        return jsonify({'upload_id': upload_id, 'index': index})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Verify and assemble an upload, then queue it for face processing"""
+    try:
+        status = chunked_uploads.status(upload_id)
+        if status is None:
+            return jsonify({'error': 'Upload not found'}), 404
         
+        unique_filename = generate_unique_filename(status['filename'])
+        file_path = os.path.join(app.config['STAGING_FOLDER'], unique_filename)
+        chunked_uploads.finalize(upload_id, file_path)
+        
+        photo, created = ingest_file(file_path, status['filename'], storage)
+        if not photo:
+            return jsonify({'error': 'Invalid image'}), 400
+        
+        db.session.commit()
+        if not created:
+            return jsonify({'photo': photo.to_dict(), 'duplicate': True, 'processing': False})
+        
+        processing_queue.submit(photo)
+        event_bus.publish('photos_uploaded', {'photo_ids': [photo.id]})
+        
+        return jsonify({'photo': photo.to_dict(faces_count=0), 'duplicate': False, 'processing': True})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    """Abort an upload and delete its chunks"""
+    if not chunked_uploads.discard(upload_id):
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify({'message': 'Upload aborted'})
+
+def parse_fields():
+    """Parse the sparse field selection from ?fields=a,b,c (None means all fields)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+def photos_with_faces_count(fields=None):
+    """
+    Photo query that also selects faces_count with a correlated subquery, so
+    serializing a page does not lazy-load every photo's faces. The count uses
+    ix_face_photo_id and only runs for the rows on the page.
+    Returns rows of (Photo, faces_count)
+    """
+    if fields is not None and 'faces_count' not in fields:
+        return db.session.query(Photo, db.literal(None))
+    
+    faces_count = db.select(db.func.count(Face.id)).where(Face.photo_id == Photo.id).scalar_subquery()
+    
+    return db.session.query(Photo, faces_count)
+
+def keyset_page(query, cursor, limit, fields=None):
+    """
+    Fetch one page of (Photo, faces_count) rows ordered newest first, using
+    the (upload_date, id) keyset instead of OFFSET so deep pages stay cheap
+    Returns dict with photos, next_cursor and has_next
+    """
+    if cursor:
+        upload_date, photo_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            Photo.upload_date < upload_date,
+            db.and_(Photo.upload_date == upload_date, Photo.id < photo_id)
+        ))
+    
+    rows = query.order_by(Photo.upload_date.desc(), Photo.id.desc()).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        'photos': [photo.to_dict(faces_count=count, fields=fields) for photo, count in rows],
+        'next_cursor': encode_cursor(rows[-1][0].upload_date, rows[-1][0].id) if has_next else None,
+        'has_next': has_next
+    }
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events stream of upload, processing, import and album changes.
+    Reconnecting clients send Last-Event-ID and get the events they missed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscriber = event_bus.subscribe(last_event_id=last_event_id)
+    
+    return Response(
+        event_bus.stream(subscriber),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/photos', methods=['GET'])
+def get_photos():
+    """
+    Get photos newest first. Pass ?cursor= from the previous response's
+    next_cursor to page; ?page= keeps the old offset pagination.
+    """
+    try:
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+        fields = parse_fields()
+        query = photos_with_faces_count(fields)
+        
+        if 'page' in request.args and 'cursor' not in request.args:
+            page = request.args.get('page', 1, type=int)
+            total = Photo.query.count()
+            rows = query.order_by(Photo.upload_date.desc(), Photo.id.desc()).offset(
+                (max(page, 1) - 1) * per_page
+            ).limit(per_page).all()
+            pages = (total + per_page - 1) // per_page
+            
+            return jsonify({
+                'photos': [photo.to_dict(faces_count=count, fields=fields) for photo, count in rows],
+                'total': total,
+                'pages': pages,
+                'current_page': page,
+                'has_next': page < pages,
+                'has_prev': page > 1
+            })
+        
+        return jsonify(keyset_page(query, request.args.get('cursor'), per_page, fields))
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -179,98 +349,69 @@ def get_albums():
 
 @app.route('/api/albums/<int:person_id>', methods=['GET'])
 def get_album_photos(person_id):
-    """Get all photos for a specific person"""
-    try:
-        person = Person.query.get_or_404(person_id)
-        
-        if person.is_merged:
-            return jsonify({'error': 'Person has been merged'}), 404
-        
-        # Get all photos containing this person
-        photo_ids = [face.photo_id for face in person.faces]
-        photos = Photo.query.filter(Photo.id.in_(photo_ids)).all()
-        
-        return jsonify({
-            'person': person.to_dict(),
-            'photos': [photo.to_dict() for photo in photos]
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/albums/<int:person_id>/download', methods=['GET'])
-def download_album(person_id):
-    """Download all photos of a person as ZIP"""
+    """Get a page of photos for a specific person (?cursor=, ?per_page=, ?fields=)"""
     try:
         person = Person.query.get_or_404(person_id)
         
         if person.is_merged:
+            # Redirect to the person this one was merged into
+            merged_into_id = face_processor.resolve_person_id(person_id)
+            if merged_into_id and merged_into_id != person_id:
+                return redirect(url_for('get_album_photos', person_id=merged_into_id, **request.args))
             return jsonify({'error': 'Person has been merged'}), 404
         
-        # Get all photos containing this person
-        photo_ids = [face.photo_id for face in person.faces]
-        photos = Photo.query.filter(Photo.id.in_(photo_ids)).all()
-        
-        if not photos:
-            return jsonify({'error': 'No photos found'}), 404
+        per_page = max(1, min(request.args.get('per_page', 60, type=int), 200))
+        fields = parse_fields()
         
-        # Create temporary ZIP file
-        temp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(temp_dir, f"{person.name.replace(' ', '_')}_photos.zip")
+        # Page through the photos containing this person
+        photo_ids = db.session.query(Face.photo_id).filter_by(person_id=person.id)
+        query = photos_with_faces_count(fields).filter(Photo.id.in_(photo_ids))
+        page = keyset_page(query, request.args.get('cursor'), per_page, fields)
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for photo in photos:
-                if os.path.exists(photo.file_path):
-                    zipf.write(photo.file_path, photo.original_filename)
-        
-        return send_file(
-            zip_path,
-            as_attachment=True,
-            download_name=f"{person.name.replace(' ', '_')}_photos.zip",
-            mimetype='application/zip'
-        )
+        return jsonify(dict(page, person=person.to_dict()))
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/photos/<int:photo_id>/image', methods=['GET'])
-def get_photo_image(photo_id):
-    """Serve photo image"""
+@app.route('/api/search/face', methods=['POST'])
+def search_by_face():
+    """Find the albums matching the face in an uploaded selfie (nothing is stored)"""
     try:
-        photo = Photo.query.get_or_404(photo_id)
-        
-        # Check if thumbnail is requested
-        thumbnail = request.args.get('thumbnail', 'false').lower() == 'true'
+        file = request.files.get('file')
+        if not file or not file.filename:
+            return jsonify({'error': 'No file provided'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        
+        limit = max(1, min(request.args.get('limit', 5, type=int), 50))
+        per_page = max(1, min(request.args.get('per_page', 60, type=int), 200))
+        max_distance = request.args.get('max_distance', type=float)
+        
+        results = face_processor.search_face(file.stream, limit=limit, max_distance=max_distance)
+        if results is None:
+            return jsonify({'error': 'No face found in image'}), 422
+        
+        persons = {p.id: p for p in Person.query.filter(
+            Person.id.in_([match['person_id'] for match in results['persons']])
+        ).all()}
+        matches = [
+            dict(persons[match['person_id']].to_dict(), distance=match['distance'])
+            for match in results['persons'] if match['person_id'] in persons
+        ]
+        
+        # Return the first page of the best match's album; fetch the rest
+        # from /api/albums/<id> with next_cursor
+        album = {'photos': [], 'next_cursor': None, 'has_next': False}
+        if matches:
+            photo_ids = db.session.query(Face.photo_id).filter_by(person_id=matches[0]['id'])
+            query = photos_with_faces_count().filter(Photo.id.in_(photo_ids))
+            album = keyset_page(query, None, per_page)
+        
+        return jsonify(dict(album, matches=matches, faces=results['faces']))
         
-        if thumbnail:
-            thumbnail_path = os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails', photo.filename)
-            if os.path.exists(thumbnail_path):
-                return send_file(thumbnail_path)
-        
-        # Serve original image
-        if os.path.exists(photo.file_path):
-            return send_file(photo.file_path)
-        else:
-            return jsonify({'error': 'Image not found'}), 404
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/photos/<int:photo_id>/download', methods=['GET'])
-def download_photo(photo_id):
-    """Download a single photo"""
-    try:
-        photo = Photo.query.get_or_404(photo_id)
-        
-        if os.path.exists(photo.file_path):
-            return send_file(
-                photo.file_path,
-                as_attachment=True,
-                download_name=photo.original_filename
-            )
-        else:
-            return jsonify({'error': 'Image not found'}), 404
-            
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -289,6 +430,7 @@ def rename_person(person_id):
         person = Person.query.get_or_404(person_id)
         person.name = new_name
         db.session.commit()
+        event_bus.publish('album_changed', {'person_ids': [person.id], 'reason': 'renamed'})
         
         return jsonify({'message': 'Person renamed successfully', 'person': person.to_dict()})
         
@@ -298,45 +440,87 @@ def rename_person(person_id):
 
 @app.route('/api/admin/persons/merge', methods=['POST'])
 def merge_persons():
-    """Merge two persons"""
+    """Merge persons: either person_id_2 into person_id_1, or all source_ids into target_id"""
     try:
         data = request.get_json()
-        person_id_1 = data.get('person_id_1')
-        person_id_2 = data.get('person_id_2')
         
-        if not person_id_1 or not person_id_2:
-            return jsonify({'error': 'Both person IDs are required'}), 400
+        if 'target_id' in data:
+            target_id = data.get('target_id')
+            source_ids = data.get('source_ids') or []
+        else:
+            target_id = data.get('person_id_1')
+            source_ids = [data.get('person_id_2')] if data.get('person_id_2') else []
+        
+        if not target_id or not source_ids:
+            return jsonify({'error': 'A target and at least one person to merge are required'}), 400
+        
+        is_id = lambda value: isinstance(value, int) and not isinstance(value, bool)
+        if not is_id(target_id) or not isinstance(source_ids, list) or not all(map(is_id, source_ids)):
+            return jsonify({'error': 'target_id must be a person id and source_ids a list of person ids'}), 400
         
-        if person_id_1 == person_id_2:
+        if target_id in source_ids:
             return jsonify({'error': 'Cannot merge person with themselves'}), 400
         
-        success = face_processor.merge_persons(person_id_1, person_id_2)
+        merged_id = face_processor.merge_persons(target_id, source_ids)
         
-        if success:
-            return jsonify({'message': 'Persons merged successfully'})
+        if merged_id:
+            event_bus.publish('album_changed', {
+                'person_ids': [merged_id] + [pid for pid in source_ids if pid != merged_id],
+                'reason': 'merged'
+            })
+            return jsonify({'message': 'Persons merged successfully', 'person_id': merged_id})
         else:
             return jsonify({'error': 'Failed to merge persons'}), 500
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/persons/suggestions', methods=['GET'])
+def get_merge_suggestions():
+    """Get the most similar pairs of persons as merge candidates"""
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        threshold = request.args.get('threshold', app.config['FACE_RECOGNITION_TOLERANCE'], type=float)
+        
+        pairs = merge_suggester.suggest(limit=limit, threshold=threshold)
+        
+        person_ids = {person_id for pair in pairs for person_id in pair[:2]}
+        persons = {p.id: p.to_dict() for p in Person.query.filter(Person.id.in_(person_ids)).all()}
+        
+        return jsonify({
+            'suggestions': [
+                {
+                    'person_1': persons[person_id_1],
+                    'person_2': persons[person_id_2],
+                    'distance': distance
+                }
+                for person_id_1, person_id_2, distance in pairs
+                if person_id_1 in persons and person_id_2 in persons
+            ]
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/photos/<int:photo_id>', methods=['DELETE'])
 def delete_photo(photo_id):
     """Delete a photo"""
     try:
         photo = Photo.query.get_or_404(photo_id)
         
-        # Delete files
-        if os.path.exists(photo.file_path):
-            os.remove(photo.file_path)
-        
-        thumbnail_path = os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails', photo.filename)
-        if os.path.exists(thumbnail_path):
-            os.remove(thumbnail_path)
+        # Only the row is deleted here; the garbage collector removes the files
+        stats.increment(
+            total_photos=-1,
+            processed_photos=-1 if photo.processed else 0,
+            total_faces=-Face.query.filter_by(photo_id=photo.id).count(),
+            total_storage=-(photo.file_size or 0)
+        )
         
         # Delete from database (faces will be deleted due to cascade)
         db.session.delete(photo)
         db.session.commit()
+        face_processor.index.remove_photo(photo_id)
+        event_bus.publish('photo_deleted', {'photo_id': photo_id})
         
         return jsonify({'message': 'Photo deleted successfully'})
         
@@ -344,30 +528,79 @@ def delete_photo(photo_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/import', methods=['POST'])
+def start_import():
+    """Import a ZIP/TAR archive or directory from IMPORT_FOLDER: {path}"""
+    try:
+        data = request.get_json() or {}
+        path = data.get('path', '')
+        
+        import_folder = os.path.realpath(app.config['IMPORT_FOLDER'])
+        source = os.path.realpath(os.path.join(import_folder, path))
+        
+        if not path or os.path.commonpath([import_folder, source]) != import_folder:
+            return jsonify({'error': 'Path must be inside the import folder'}), 400
+        
+        if not os.path.exists(source):
+            return jsonify({'error': 'Path not found'}), 404
+        
+        job = importer.start(source)
+        return jsonify(job.to_dict()), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/import/<job_id>', methods=['GET'])
+def get_import(job_id):
+    """Get progress of an import job"""
+    job = importer.jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/api/admin/stats', methods=['GET'])
 def get_stats():
-    """Get system statistics"""
+    """Get system statistics from the incrementally maintained counters"""
     try:
-        total_photos = Photo.query.count()
-        processed_photos = Photo.query.filter_by(processed=True).count()
-        total_persons = Person.query.filter_by(is_merged=False).count()
-        total_faces = Face.query.count()
-        
-        # Calculate total storage used
-        total_size = db.session.query(db.func.sum(Photo.file_size)).scalar() or 0
+        counters = stats.read_counters()
+        total_photos = counters['total_photos']
+        processed_photos = counters['processed_photos']
         
         return jsonify({
             'total_photos': total_photos,
             'processed_photos': processed_photos,
-            'total_persons': total_persons,
-            'total_faces': total_faces,
-            'total_storage': format_file_size(total_size),
+            'total_persons': counters['total_persons'],
+            'total_faces': counters['total_faces'],
+            'total_storage': format_file_size(counters['total_storage']),
+            'total_storage_bytes': counters['total_storage'],
             'processing_progress': (processed_photos / total_photos * 100) if total_photos > 0 else 0
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/stats/reconcile', methods=['POST'])
+def reconcile_stats():
+    """Recompute the stats counters from the tables and report any drift"""
+    try:
+        drift = stats.reconcile()
+        return jsonify({'message': 'Stats reconciled', 'drift': drift})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/gc', methods=['POST'])
+def collect_garbage():
+    """Delete unreferenced uploads, thumbnails and stale temp files now"""
+    try:
+        report = garbage_collector.collect()
+        report['reclaimed'] = format_file_size(report['bytes_reclaimed'])
+        return jsonify(report)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/reprocess', methods=['POST'])
 def reprocess_faces():
     """Reprocess all faces and regroup"""
@@ -376,9 +609,12 @@ def reprocess_faces():
         Face.query.update({'person_id': None})
         Person.query.update({'is_merged': False, 'merged_into_id': None})
         db.session.commit()
+        face_processor.index.invalidate()
         
         # Regroup faces
         face_processor.group_faces()
+        stats.reconcile()
+        event_bus.publish('album_changed', {'person_ids': None, 'reason': 'regrouped'})
         
         return jsonify({'message': 'Face reprocessing started'})
         
@@ -396,10 +632,50 @@ def internal_error(error):
     db.session.rollback()
     return jsonify({'error': 'Internal server error'}), 500
 
-if __name__ == '__main__':
+@app.cli.command('import-photos')
+@click.argument('source', type=click.Path(exists=True))
+@click.option('--workers', type=int, default=None, help='Worker processes (default: one per CPU core)')
+def import_photos_command(source, workers):
+    """Import a ZIP/TAR archive or directory of photos"""
+    job_importer = Importer(app, face_processor, workers=workers or app.config['IMPORT_WORKERS'])
+    
+    def report(job):
+        print(f"\r{job.imported} imported, {job.skipped} skipped, {job.failed} failed, {job.faces} faces", end='')
+    
+    job = job_importer.run(ImportJob(os.path.abspath(source)), on_progress=report)
+    print()
+    print(job.to_dict())
+
+@app.cli.command('export-encodings')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--chunk-size', type=int, default=10000, help='Rows per chunk')
+@click.option('--float32', is_flag=True, help='Store encodings as float32 (half the size, not bit-exact)')
+def export_encodings_command(path, chunk_size, float32):
+    """Export photos, persons and face encodings to a columnar .npz archive"""
+    def report(table, rows):
+        print(f"\r{table}: {rows} rows".ljust(30), end='')
+    
     with app.app_context():
-        db.create_all()
+        counts = export_encodings(path, chunk_size=chunk_size,
+                                  dtype='float32' if float32 else 'float64', on_progress=report)
+    print()
+    print(counts)
+
+@app.cli.command('import-encodings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_encodings_command(path):
+    """Import an archive written by export-encodings, updating rows with matching ids"""
+    def report(table, rows):
+        print(f"\r{table}: {rows} rows".ljust(30), end='')
     
+    with app.app_context():
+        result = import_encodings(path, on_progress=report)
+        stats.reconcile()
+    print()
+    print(result)
+    print('Restart the API server so it reloads the face index')
+
+if __name__ == '__main__':
     app.run(
         host='0.0.0.0',
         port=8000,
@@ -0,0 +1,154 @@
+"""
+Evaluate face clustering algorithms against known identities.
+
+Usage (from the backend directory):
+    python -m benchmarks.clustering --archive faces.npz [--min-quality 0.2] [--sample 20000]
+    python -m benchmarks.clustering [--faces 20000] [--persons 400]
+        [--algorithms dbscan,hdbscan,agglomerative,chinese_whispers] [--thresholds 0.5,0.6]
+        [--params '{"hdbscan": {"min_cluster_size": 3}}']
+
+Faces come from an archive written by `flask --app app export-encodings`,
+with person_id as the ground truth (curate the persons in the app first:
+uncorrected assignments only measure agreement with the current clustering),
+or are generated with several pose modes per person. Each algorithm and
+threshold runs in a forked process, and the report lists pairwise precision
+(pairs put together that belong together), pairwise recall (pairs that belong
+together and were put together), F1, cluster count, runtime and peak memory
+above the loaded data. A configuration that runs out of memory is reported
+as failed rather than stopping the run.
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import resource
+import time
+import numpy as np
+
+from clustering import ALGORITHMS, cluster_encodings
+from encoding_archive import iter_chunks
+
+QUADRATIC = {'agglomerative'}  # O(n^2) memory, skipped above --quadratic-limit
+
+def load_archive(path, min_quality):
+    person_ids, encodings = [], []
+    for chunk in iter_chunks(path, 'faces', columns=['person_id', 'quality', 'encoding']):
+        keep = chunk['person_id'] >= 0
+        if min_quality:
+            keep &= np.isnan(chunk['quality']) | (chunk['quality'] >= min_quality)
+        person_ids.append(chunk['person_id'][keep])
+        encodings.append(chunk['encoding'][keep])
+    if not person_ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+    return np.concatenate(person_ids), np.concatenate(encodings)
+
+def make_faces(rng, persons, modes, count, spread, noise, lookalikes):
+    identities = rng.normal(0, 0.06, size=(persons, 128))
+    # Some persons resemble another one (siblings), about 0.4 apart
+    similar = rng.choice(persons, int(persons * lookalikes), replace=False)
+    identities[similar] = identities[(similar + 1) % persons] + rng.normal(0, 0.035, size=(len(similar), 128))
+    offsets = rng.normal(0, 0.1, size=(persons, modes, 128))
+    person_ids = rng.integers(0, persons, size=count)
+    mode_ids = rng.integers(0, modes, size=count)
+    encodings = identities[person_ids] + offsets[person_ids, mode_ids] * spread
+    return person_ids, encodings + rng.normal(0, noise, size=encodings.shape)
+
+def pair_count(sizes):
+    sizes = sizes.astype(np.int64)
+    return int((sizes * (sizes - 1) // 2).sum())
+
+def pairwise_scores(truth, predicted):
+    """Pairwise precision, recall and F1 from the contingency table, without enumerating pairs"""
+    _, joint = np.unique(np.stack([truth, predicted]), axis=1, return_counts=True)
+    together = pair_count(joint)
+    predicted_pairs = pair_count(np.unique(predicted, return_counts=True)[1])
+    true_pairs = pair_count(np.unique(truth, return_counts=True)[1])
+    precision = together / predicted_pairs if predicted_pairs else 1.0
+    recall = together / true_pairs if true_pairs else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+def run(encodings, name, threshold, params, results):
+    """Child process: cluster once and report labels, seconds and peak RSS growth in MB"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    labels = cluster_encodings(encodings, name, threshold, **params)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((labels, seconds, (peak - baseline) / 1024))
+
+def evaluate(encodings, name, threshold, params):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=run, args=(encodings, name, threshold, params, results))
+    process.start()
+    outcome = None
+    while outcome is None:
+        try:
+            outcome = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+    process.join()
+    if outcome is None or process.exitcode != 0:
+        return None, f"failed (exit code {process.exitcode})"
+    return outcome, None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive', help='archive from export-encodings; synthetic faces if omitted')
+    parser.add_argument('--min-quality', type=float, default=0.0, help='leave out archived faces scored below this')
+    parser.add_argument('--sample', type=int, help='evaluate a random sample of this many faces')
+    parser.add_argument('--faces', type=int, default=20000)
+    parser.add_argument('--persons', type=int, default=400)
+    parser.add_argument('--modes', type=int, default=3, help='pose modes per synthetic person')
+    parser.add_argument('--spread', type=float, default=0.25, help='distance scale of pose modes from the identity')
+    parser.add_argument('--lookalikes', type=float, default=0.1, help='fraction of synthetic persons resembling another')
+    parser.add_argument('--noise', type=float, default=0.02)
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS))
+    parser.add_argument('--thresholds', default='0.5,0.6')
+    parser.add_argument('--params', default='{}', help='JSON of extra parameters per algorithm')
+    parser.add_argument('--quadratic-limit', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.archive:
+        person_ids, encodings = load_archive(args.archive, args.min_quality)
+    else:
+        person_ids, encodings = make_faces(
+            rng, args.persons, args.modes, args.faces, args.spread, args.noise, args.lookalikes
+        )
+
+    if args.sample and args.sample < len(encodings):
+        chosen = rng.choice(len(encodings), args.sample, replace=False)
+        person_ids, encodings = person_ids[chosen], encodings[chosen]
+
+    if len(encodings) < 2:
+        raise SystemExit('Need at least two faces with a person to evaluate')
+
+    encodings = np.ascontiguousarray(encodings, dtype=np.float64)
+    params = json.loads(args.params)
+    print(f"{len(encodings)} faces, {len(np.unique(person_ids))} persons, "
+          f"{encodings.nbytes / 1024 / 1024:.0f} MB of encodings")
+    print(f"{'algorithm':<18}{'threshold':>10}{'precision':>11}{'recall':>8}{'f1':>7}"
+          f"{'clusters':>10}{'seconds':>9}{'peak MB':>9}")
+
+    for name in args.algorithms.split(','):
+        for threshold in (float(value) for value in args.thresholds.split(',')):
+            row = f"{name:<18}{threshold:>10.2f}"
+            if name in QUADRATIC and len(encodings) > args.quadratic_limit:
+                print(f"{row}  skipped: O(n^2) memory above --quadratic-limit {args.quadratic_limit}")
+                continue
+
+            outcome, error = evaluate(encodings, name, threshold, params.get(name, {}))
+            if error:
+                print(f"{row}  {error}")
+                continue
+
+            labels, seconds, peak_mb = outcome
+            precision, recall, f1 = pairwise_scores(person_ids, labels)
+            print(f"{row}{precision:>11.3f}{recall:>8.3f}{f1:>7.3f}"
+                  f"{len(np.unique(labels)):>10}{seconds:>9.2f}{peak_mb:>9.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark face engines against each other on the same set of images.
+
+Usage (from the backend directory):
+    python -m benchmarks.engines <image_dir> [--engines dlib,opencv,mock]
+
+The first engine is the reference: detections of the other engines are
+matched to it at IoU >= 0.5 to report detection recall and precision.
+"""
+import argparse
+import os
+import time
+
+from config import Config
+from face_engines import create_engine_from_config
+from utils import allowed_file
+
+def iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+def count_matches(reference, candidate, threshold=0.5):
+    """Greedy one-to-one matching of candidate boxes to reference boxes"""
+    unmatched = list(reference)
+    matches = 0
+    for box in candidate:
+        best = max(unmatched, key=lambda ref: iou(ref, box), default=None)
+        if best is not None and iou(best, box) >= threshold:
+            unmatched.remove(best)
+            matches += 1
+    return matches
+
+def run_engine(engine, image_paths):
+    """Run an engine over all images, returning per-image detections and timings"""
+    detections = []
+    timings = []
+    for path in image_paths:
+        image = engine.load_image(path)
+        start = time.perf_counter()
+        face_locations, _ = engine.detect_and_encode(image)
+        timings.append(time.perf_counter() - start)
+        detections.append(face_locations)
+    return detections, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image_dir')
+    parser.add_argument('--engines', default='dlib,opencv,mock')
+    args = parser.parse_args()
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    image_paths = sorted(
+        os.path.join(args.image_dir, name) for name in os.listdir(args.image_dir) if allowed_file(name)
+    )
+    if not image_paths:
+        print('No images found')
+        return
+
+    reference = None
+    print(f"{'engine':<10} {'ms/img':>8} {'p95 ms':>8} {'faces':>6} {'recall':>7} {'prec':>7}")
+
+    for name in args.engines.split(','):
+        try:
+            engine = create_engine_from_config(config, name=name)
+        except Exception as e:
+            print(f"{name:<10} unavailable: {str(e)}")
+            continue
+
+        detections, timings = run_engine(engine, image_paths)
+        timings.sort()
+        mean_ms = sum(timings) / len(timings) * 1000
+        p95_ms = timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+        total_faces = sum(len(d) for d in detections)
+
+        if reference is None:
+            reference = detections
+            recall = precision = 1.0
+        else:
+            matched = sum(count_matches(ref, det) for ref, det in zip(reference, detections))
+            reference_faces = sum(len(d) for d in reference)
+            recall = matched / reference_faces if reference_faces else 0.0
+            precision = matched / total_faces if total_faces else 0.0
+
+        print(f"{name:<10} {mean_ms:>8.1f} {p95_ms:>8.1f} {total_faces:>6} {recall:>7.2f} {precision:>7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test the media routes with slow album downloads.
+
+Usage (from the backend directory, against a running server):
+    python -m benchmarks.media_load --url http://localhost:12002/api --person-id 1 --photo-id 1
+        [--slow-clients 100] [--read-rate 32] [--duration 20]
+
+Opens slow-clients album downloads that each read at read-rate KB/s, like
+phones on a weak connection, and keeps them open for the whole run. Meanwhile
+thumbnails are requested one after another, and the report shows how many
+slow downloads were being served at once and how thumbnail latency held up.
+With sync workers the slow downloads occupy every worker and thumbnails queue
+behind them; with the gevent media tier thumbnails keep responding.
+"""
+import argparse
+import threading
+import time
+import http.client
+from urllib.parse import urlsplit
+import numpy as np
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak_active = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def change_active(self, delta):
+        with self.lock:
+            self.active += delta
+            self.peak_active = max(self.peak_active, self.active)
+
+def slow_download(url, path, read_rate, stop, counters, timeout):
+    """Download path over and over at read_rate bytes per second until stopped"""
+    chunk = max(read_rate // 10, 1)
+    while not stop.is_set():
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+        connected = False
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            counters.change_active(1)
+            connected = True
+            while not stop.is_set():
+                data = response.read(chunk)
+                if not data:
+                    break
+                with counters.lock:
+                    counters.bytes += len(data)
+                time.sleep(0.1)
+        except Exception:
+            with counters.lock:
+                counters.errors += 1
+            stop.wait(1)
+        finally:
+            if connected:
+                counters.change_active(-1)
+            conn.close()
+
+def probe(url, path, timeout):
+    """Time one complete request; returns milliseconds, or None on failure"""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            return None
+        return (time.perf_counter() - start) * 1000
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:12002/api')
+    parser.add_argument('--person-id', type=int, required=True, help='album to download slowly')
+    parser.add_argument('--photo-id', type=int, required=True, help='thumbnail to probe')
+    parser.add_argument('--slow-clients', type=int, default=100)
+    parser.add_argument('--read-rate', type=int, default=32, help='KB/s per slow client')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--timeout', type=float, default=10)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    album_path = f"{url.path}/albums/{args.person_id}/download"
+    thumbnail_path = f"{url.path}/photos/{args.photo_id}/image?thumbnail=true"
+
+    baseline = [probe(url, thumbnail_path, args.timeout) for _ in range(20)]
+    baseline = [ms for ms in baseline if ms is not None]
+    if not baseline:
+        raise SystemExit(f"Thumbnail {thumbnail_path} is not reachable")
+    print(f"idle thumbnail p50 {np.percentile(baseline, 50):.1f} ms")
+
+    counters = Counters()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=slow_download, daemon=True,
+                         args=(url, album_path, args.read_rate * 1024, stop, counters, args.timeout))
+        for _ in range(args.slow_clients)
+    ]
+    for thread in threads:
+        thread.start()
+
+    latencies = []
+    failures = 0
+    deadline = time.time() + args.duration
+    while time.time() < deadline:
+        ms = probe(url, thumbnail_path, args.timeout)
+        if ms is None:
+            failures += 1
+        else:
+            latencies.append(ms)
+        time.sleep(0.05)
+
+    stop.set()
+    for thread in threads:
+        thread.join(args.timeout + 1)
+
+    print(f"slow downloads served concurrently: peak {counters.peak_active} of {args.slow_clients}, "
+          f"{counters.bytes / 1024 / 1024 / args.duration:.1f} MB/s total, {counters.errors} errors")
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"thumbnail under load: {len(latencies)} ok, {failures} failed/timed out, "
+              f"p50 {p50:.1f} ms  p99 {p99:.1f} ms")
+    else:
+        print(f"thumbnail under load: all {failures} requests failed/timed out")
+
+if __name__ == '__main__':
+    main()
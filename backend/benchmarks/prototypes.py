@@ -0,0 +1,94 @@
+"""
+Compare prototype matching against exhaustive face-by-face matching.
+
+Usage (from the backend directory):
+    python -m benchmarks.prototypes [--faces 100000] [--persons 2000] [--exemplars 0,2,4,8]
+
+Synthetic persons are drawn with several pose modes each, so a single
+centroid is not enough to represent them. Every query is matched both
+against all faces (EncodingIndex.nearest) and against per-person prototypes
+(PrototypeIndex.nearest) at the face recognition tolerance. The report lists
+latency, top-1 accuracy against the true person, agreement with exhaustive
+matching, and the cost of folding new faces into the prototypes.
+"""
+import argparse
+import time
+import numpy as np
+
+from encoding_index import EncodingIndex
+from prototypes import PrototypeIndex
+
+def make_faces(rng, identities, modes, count, spread, noise):
+    person_ids = rng.integers(0, len(identities), size=count)
+    mode_ids = rng.integers(0, modes.shape[1], size=count)
+    encodings = identities[person_ids] + modes[person_ids, mode_ids] * spread
+    return person_ids, encodings + rng.normal(0, noise, size=encodings.shape)
+
+def percentiles(latencies):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return f"p50 {p50:.3f} ms  p99 {p99:.3f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--faces', type=int, default=100000)
+    parser.add_argument('--persons', type=int, default=2000)
+    parser.add_argument('--modes', type=int, default=3, help='pose modes per person')
+    parser.add_argument('--spread', type=float, default=0.5, help='distance scale of pose modes from the identity')
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--adds', type=int, default=2000, help='faces folded in incrementally')
+    parser.add_argument('--exemplars', default='0,2,4,8')
+    parser.add_argument('--tolerance', type=float, default=0.6)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    identities = rng.normal(0, 0.1, size=(args.persons, 128))
+    modes = rng.normal(0, 0.1, size=(args.persons, args.modes, 128))
+    person_ids, encodings = make_faces(rng, identities, modes, args.faces, args.spread, 0.02)
+    query_persons, queries = make_faces(rng, identities, modes, args.queries, args.spread, 0.02)
+    add_persons, adds = make_faces(rng, identities, modes, args.adds, args.spread, 0.02)
+
+    index = EncodingIndex()
+    index.load_arrays(np.arange(args.faces), np.arange(args.faces), person_ids, encodings)
+    print(f"{args.faces} faces, {args.persons} persons, {args.modes} pose modes each")
+
+    exhaustive = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        _, _, matched, _ = index.nearest(query, k=1, max_distance=args.tolerance)
+        latencies.append((time.perf_counter() - start) * 1000)
+        exhaustive.append(int(matched[0]) if len(matched) else -1)
+    exhaustive = np.array(exhaustive)
+    print(f"exhaustive           {percentiles(latencies)}  "
+          f"accuracy {np.mean(exhaustive == query_persons):.3f}")
+
+    for exemplars in (int(value) for value in args.exemplars.split(',')):
+        prototypes = PrototypeIndex(index, exemplars=exemplars)
+        start = time.perf_counter()
+        prototypes.refresh()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        matched = []
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            person, _ = prototypes.nearest(query, k=1, max_distance=args.tolerance)
+            latencies.append((time.perf_counter() - start) * 1000)
+            matched.append(int(person[0]) if len(person) else -1)
+        matched = np.array(matched)
+
+        # Fold new faces in one at a time, as ingest does
+        start = time.perf_counter()
+        for i, (person_id, encoding) in enumerate(zip(add_persons, adds)):
+            index.add(args.faces + i, args.faces + i, int(person_id), encoding)
+            prototypes.refresh()
+        add_ms = (time.perf_counter() - start) * 1000 / max(args.adds, 1)
+        index.load_arrays(np.arange(args.faces), np.arange(args.faces), person_ids, encodings)
+
+        print(f"centroid+{exemplars} exemplars {percentiles(latencies)}  "
+              f"accuracy {np.mean(matched == query_persons):.3f}  "
+              f"agreement {np.mean(matched == exhaustive):.3f}  "
+              f"build {build_ms:.0f} ms  add {add_ms:.3f} ms/face")
+
+if __name__ == '__main__':
+    main()
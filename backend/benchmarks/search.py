@@ -0,0 +1,56 @@
+"""
+Benchmark face search latency against the in-memory encoding index.
+
+Usage (from the backend directory):
+    python -m benchmarks.search [--faces 100000] [--persons 2000] [--queries 1000]
+
+Builds an EncodingIndex of synthetic 128-d encodings clustered around
+random identities, then times nearest-neighbour queries and checks that
+the closest person is the identity the query was drawn from. Detection
+time for the uploaded selfie is engine-dependent and measured separately
+by benchmarks.engines.
+"""
+import argparse
+import time
+import numpy as np
+
+from encoding_index import EncodingIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--faces', type=int, default=100000)
+    parser.add_argument('--persons', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--target-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    identities = rng.normal(0, 0.1, size=(args.persons, 128))
+    person_ids = rng.integers(0, args.persons, size=args.faces)
+    encodings = identities[person_ids] + rng.normal(0, 0.02, size=(args.faces, 128))
+
+    index = EncodingIndex()
+    start = time.perf_counter()
+    index.load_arrays(np.arange(args.faces), np.arange(args.faces) // 3, person_ids, encodings)
+    print(f"Loaded {args.faces} faces / {args.persons} persons in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    query_persons = rng.integers(0, args.persons, size=args.queries)
+    queries = identities[query_persons] + rng.normal(0, 0.02, size=(args.queries, 128))
+
+    latencies = []
+    correct = 0
+    for person_id, query in zip(query_persons, queries):
+        start = time.perf_counter()
+        _, _, matched_person_ids, _ = index.nearest(query, k=args.k, max_distance=0.6)
+        latencies.append((time.perf_counter() - start) * 1000)
+        correct += len(matched_person_ids) > 0 and matched_person_ids[0] == person_id
+
+    latencies = np.array(latencies)
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"p50 {p50:.2f} ms  p99 {p99:.2f} ms  max {latencies.max():.2f} ms")
+    print(f"top-1 person accuracy {correct / args.queries:.3f}")
+    print('PASS' if p99 <= args.target_ms else 'FAIL', f"(p99 target {args.target_ms:.0f} ms)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+
+class ChunkedUploadStore:
+    """
+    Disk-backed sessions for resumable chunked uploads.
+    Each session is a directory holding meta.json, a preallocated data file
+    that chunks are written into at their offset, and one empty marker file
+    per received chunk. Chunks can arrive in any order, concurrently or
+    again after a dropped connection; only one chunk is ever in memory.
+    """
+
+    READ_BLOCK = 64 * 1024
+
+    def __init__(self, root, chunk_size):
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(root, exist_ok=True)
+
+    def _session_dir(self, upload_id):
+        # upload_id is a hex uuid; reject anything else so it can't escape root
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            return None
+        return os.path.join(self.root, upload_id)
+
+    def _load(self, upload_id):
+        session_dir = self._session_dir(upload_id)
+        if session_dir is None:
+            return None, None
+        try:
+            with open(os.path.join(session_dir, 'meta.json')) as f:
+                return session_dir, json.load(f)
+        except (OSError, ValueError):
+            return None, None
+
+    def create(self, filename, size, sha256=None):
+        """
+        Start an upload session
+        Returns the session metadata
+        """
+        if size <= 0:
+            raise ValueError('File size must be positive')
+
+        upload_id = uuid.uuid4().hex
+        session_dir = os.path.join(self.root, upload_id)
+        os.makedirs(os.path.join(session_dir, 'received'))
+
+        meta = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'chunk_size': self.chunk_size,
+            'total_chunks': (size + self.chunk_size - 1) // self.chunk_size
+        }
+
+        with open(os.path.join(session_dir, 'data'), 'wb') as f:
+            f.truncate(size)
+        with open(os.path.join(session_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        return meta
+
+    def status(self, upload_id):
+        """
+        Get session metadata with the list of received chunks
+        Returns None if the session does not exist
+        """
+        session_dir, meta = self._load(upload_id)
+        if meta is None:
+            return None
+
+        received = sorted(int(name) for name in os.listdir(os.path.join(session_dir, 'received')))
+        return dict(meta, received=received, missing=sorted(set(range(meta['total_chunks'])) - set(received)))
+
+    def write_chunk(self, upload_id, index, stream, sha256=None):
+        """
+        Stream one chunk from a file-like object to its offset in the data file,
+        verifying its length and optional SHA-256
+        Returns False if the session does not exist
+        """
+        session_dir, meta = self._load(upload_id)
+        if meta is None:
+            return False
+
+        if index < 0 or index >= meta['total_chunks']:
+            raise ValueError(f"Chunk index out of range (0-{meta['total_chunks'] - 1})")
+
+        # A rewrite invalidates the chunk until it has been fully verified again
+        marker = os.path.join(session_dir, 'received', str(index))
+        if os.path.exists(marker):
+            os.remove(marker)
+
+        offset = index * meta['chunk_size']
+        expected_length = min(meta['chunk_size'], meta['size'] - offset)
+        digest = hashlib.sha256()
+        written = 0
+
+        with open(os.path.join(session_dir, 'data'), 'r+b') as f:
+            f.seek(offset)
+            while True:
+                block = stream.read(self.READ_BLOCK)
+                if not block:
+                    break
+                written += len(block)
+                if written > expected_length:
+                    raise ValueError(f"Chunk {index} is larger than {expected_length} bytes")
+                digest.update(block)
+                f.write(block)
+
+        if written != expected_length:
+            raise ValueError(f"Chunk {index} has {written} bytes, expected {expected_length}")
+
+        if sha256 and digest.hexdigest() != sha256.lower():
+            raise ValueError(f"Checksum mismatch for chunk {index}")
+
+        open(marker, 'w').close()
+        return True
+
+    def finalize(self, upload_id, destination):
+        """
+        Check that every chunk arrived, verify the whole-file checksum and move
+        the data file to destination, removing the session
+        Returns the session metadata, or None if the session does not exist
+        """
+        status = self.status(upload_id)
+        if status is None:
+            return None
+
+        if status['missing']:
+            raise ValueError(f"Missing chunks: {status['missing'][:20]}")
+
+        session_dir = self._session_dir(upload_id)
+        data_path = os.path.join(session_dir, 'data')
+
+        if status['sha256']:
+            digest = hashlib.sha256()
+            with open(data_path, 'rb') as f:
+                for block in iter(lambda: f.read(self.READ_BLOCK * 16), b''):
+                    digest.update(block)
+            if digest.hexdigest() != status['sha256']:
+                raise ValueError('Checksum mismatch for file')
+
+        shutil.move(data_path, destination)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return status
+
+    def discard(self, upload_id):
+        """Delete a session and its data"""
+        session_dir = self._session_dir(upload_id)
+        if session_dir and os.path.isdir(session_dir):
+            shutil.rmtree(session_dir, ignore_errors=True)
+            return True
+        return False
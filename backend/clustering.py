@@ -0,0 +1,109 @@
+import inspect
+import numpy as np
+from sklearn.cluster import DBSCAN, HDBSCAN, AgglomerativeClustering
+from sklearn.neighbors import NearestNeighbors, radius_neighbors_graph
+
+# Every algorithm takes the encodings and a distance threshold (the face
+# recognition tolerance unless configured otherwise) and returns one label per
+# face. Label -1 marks noise, which the caller turns into singleton clusters.
+
+def dbscan(encodings, threshold, min_samples=1):
+    """Density clustering; with min_samples=1 this is single linkage cut at threshold, so chains can bridge persons"""
+    return DBSCAN(eps=threshold, min_samples=min_samples, metric='euclidean').fit_predict(encodings)
+
+def hdbscan(encodings, threshold, min_cluster_size=2, min_samples=None, cluster_selection_epsilon=0.0):
+    """
+    Hierarchical density clustering, robust to clusters of varying density.
+    Faces it leaves as noise join the cluster of their nearest clustered face
+    when that is within threshold
+    """
+    labels = HDBSCAN(
+        min_cluster_size=min_cluster_size,
+        min_samples=min_samples,
+        cluster_selection_epsilon=cluster_selection_epsilon,
+        copy=True
+    ).fit_predict(encodings)
+
+    noise = labels < 0
+    if noise.any() and not noise.all():
+        distances, nearest = NearestNeighbors(n_neighbors=1).fit(encodings[~noise]).kneighbors(encodings[noise])
+        attached = labels[~noise][nearest[:, 0]]
+        labels[noise] = np.where(distances[:, 0] <= threshold, attached, -1)
+    return labels
+
+def agglomerative(encodings, threshold, linkage='average'):
+    """
+    Agglomerative clustering cut at threshold. Average or complete linkage
+    does not chain like DBSCAN, but needs O(n^2) memory
+    """
+    return AgglomerativeClustering(
+        n_clusters=None,
+        distance_threshold=threshold,
+        linkage=linkage
+    ).fit_predict(encodings)
+
+def chinese_whispers(encodings, threshold, iterations=20, seed=0):
+    """
+    Chinese Whispers graph clustering (as in dlib): faces closer than threshold
+    are linked, then every face repeatedly takes the most common label among its
+    neighbours until labels settle
+    """
+    graph = radius_neighbors_graph(encodings, threshold, mode='connectivity', include_self=False)
+    indptr, indices = graph.indptr, graph.indices
+    labels = np.arange(len(encodings))
+    rng = np.random.default_rng(seed)
+
+    for _ in range(iterations):
+        changed = 0
+        for node in rng.permutation(len(encodings)):
+            neighbours = indices[indptr[node]:indptr[node + 1]]
+            if len(neighbours) == 0:
+                continue
+            candidates, counts = np.unique(labels[neighbours], return_counts=True)
+            label = candidates[np.argmax(counts)]
+            if label != labels[node]:
+                labels[node] = label
+                changed += 1
+        if changed == 0:
+            break
+
+    return labels
+
+ALGORITHMS = {
+    'dbscan': dbscan,
+    'hdbscan': hdbscan,
+    'agglomerative': agglomerative,
+    'chinese_whispers': chinese_whispers,
+}
+
+def check_params(name, params):
+    """Raise ValueError unless name is a known algorithm accepting params"""
+    try:
+        algorithm = ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown clustering algorithm: {name}")
+    try:
+        inspect.signature(algorithm).bind(None, **params)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {name}: {str(e)}")
+
+def cluster_encodings(encodings, name='dbscan', threshold=0.6, **params):
+    """
+    Cluster encodings with the named algorithm
+    Returns array of labels 0..n_clusters-1; noise faces get a cluster of their own
+    """
+    encodings = np.asarray(encodings, dtype=np.float64)
+    if len(encodings) < 2:
+        return np.arange(len(encodings))
+
+    check_params(name, {'threshold': threshold, **params})
+    labels = np.asarray(ALGORITHMS[name](encodings, threshold, **params))
+
+    noise = labels < 0
+    if noise.any():
+        labels = labels.copy()
+        labels[noise] = labels.max() + 1 + np.arange(noise.sum())
+
+    # Renumber densely in order of first appearance
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first))[inverse]
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,13 +8,51 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///wedding_photos.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    CORS_ORIGINS = ["http://localhost:3000", "https://work-1-nbzjicskggkwmgic.prod-runtime.all-hands.dev"]
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or '../uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    TEMP_FOLDER = os.environ.get('TEMP_FOLDER') or os.path.join(UPLOAD_FOLDER, 'tmp')  # scratch files, swept by the storage GC
+    STAGING_FOLDER = os.path.join(UPLOAD_FOLDER, 'staging')  # uploads before they move into storage
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max request size
+    
+    # Chunked upload settings
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # must stay below MAX_CONTENT_LENGTH
+    MAX_UPLOAD_FILE_SIZE = 200 * 1024 * 1024
+    PROCESSING_WORKERS = int(os.environ.get('PROCESSING_WORKERS') or 1)
+    PROCESSING_QUEUE_LIMIT = int(os.environ.get('PROCESSING_QUEUE_LIMIT') or 500)  # backlog before uploads get 503
+    
+    # Bulk import settings
+    IMPORT_FOLDER = os.environ.get('IMPORT_FOLDER') or '../imports'  # archives/directories importable over the API
+    IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS') or 0) or None  # None = one per CPU core
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
     
     # Face recognition settings
-    FACE_RECOGNITION_TOLERANCE = 0.6
-    FACE_RECOGNITION_MODEL = 'hog'  # 'hog' for CPU, 'cnn' for GPU
+    FACE_ENGINE = os.environ.get('FACE_ENGINE') or 'mock'  # 'dlib', 'opencv' or 'mock'
+    FACE_RECOGNITION_TOLERANCE = float(os.environ.get('FACE_RECOGNITION_TOLERANCE') or 0.6)
+    FACE_RECOGNITION_MODEL = os.environ.get('FACE_RECOGNITION_MODEL') or 'hog'  # 'hog' for CPU, 'cnn' for GPU
+    FACE_PROTOTYPE_EXEMPLARS = int(os.environ.get('FACE_PROTOTYPE_EXEMPLARS') or 4)  # matched per person besides the centroid
+    FACE_MIN_QUALITY = float(os.environ.get('FACE_MIN_QUALITY') or 0.2)  # faces below this stay out of matching and clustering
+    FACE_CLUSTERING = os.environ.get('FACE_CLUSTERING') or 'dbscan'  # 'dbscan', 'hdbscan', 'agglomerative' or 'chinese_whispers'
+    FACE_CLUSTERING_PARAMS = json.loads(os.environ.get('FACE_CLUSTERING_PARAMS') or '{}')  # e.g. {"threshold": 0.5, "linkage": "complete"}
+    
+    # OpenCV engine settings
+    OPENCV_FACE_DETECTOR = os.environ.get('OPENCV_FACE_DETECTOR') or 'haar'  # 'haar' or 'dnn'
+    OPENCV_DNN_MODEL = os.environ.get('OPENCV_DNN_MODEL')  # res10_300x300_ssd .caffemodel
+    OPENCV_DNN_CONFIG = os.environ.get('OPENCV_DNN_CONFIG')  # deploy.prototxt
+    OPENCV_SFACE_MODEL = os.environ.get('OPENCV_SFACE_MODEL')  # face_recognition_sface .onnx
+    
+    # Storage backend for originals and thumbnails
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND') or 'local'  # 'local' or 's3'
+    STORAGE_ROOT = os.environ.get('STORAGE_ROOT') or UPLOAD_FOLDER  # local backend
+    S3_BUCKET = os.environ.get('AWS_S3_BUCKET')
+    S3_REGION = os.environ.get('AWS_REGION')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')  # e.g. http://localhost:9000 for MinIO
+    
+    # Stats counters are reconciled against the tables this often (seconds)
+    STATS_RECONCILE_INTERVAL = int(os.environ.get('STATS_RECONCILE_INTERVAL') or 300)
+    
+    # Storage garbage collection (seconds)
+    GC_INTERVAL = int(os.environ.get('GC_INTERVAL') or 3600)
+    GC_MIN_AGE = int(os.environ.get('GC_MIN_AGE') or 3600)  # never delete files younger than this
     
     # Admin settings
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD') or 'admin123'
\ No newline at end of file
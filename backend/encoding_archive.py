@@ -0,0 +1,211 @@
+import json
+import zipfile
+import numpy as np
+from models import db, Photo, Person, Face
+
+FORMAT = 'face-encodings'
+VERSION = 1
+
+# Tables in foreign key order, with the columns exported for each and how they
+# are stored: nullable ints as -1, nullable floats as NaN, nullable strings as
+# '' and missing dates as NaT, so every column is a plain numpy array
+TABLES = [
+    ('photos', Photo, [
+        ('id', 'int'), ('filename', 'str'), ('original_filename', 'str'), ('file_path', 'str'),
+        ('thumbnail_key', 'str'), ('content_hash', 'str'), ('upload_date', 'datetime'),
+        ('file_size', 'int'), ('width', 'int'), ('height', 'int'), ('processed', 'bool')
+    ]),
+    ('persons', Person, [
+        ('id', 'int'), ('name', 'str'), ('created_date', 'datetime'),
+        ('is_merged', 'bool'), ('merged_into_id', 'int')
+    ]),
+    ('faces', Face, [
+        ('id', 'int'), ('photo_id', 'int'), ('person_id', 'int'),
+        ('top', 'int'), ('right', 'int'), ('bottom', 'int'), ('left', 'int'),
+        ('confidence', 'float'), ('quality', 'float'), ('created_date', 'datetime'),
+        ('encoding', 'encoding')
+    ]),
+]
+
+def member_name(table, chunk, column):
+    """Archive member holding one column of one chunk, e.g. faces.000003.encoding.npy"""
+    return f"{table}.{chunk:06d}.{column}.npy"
+
+def _to_array(kind, values, dtype):
+    if kind == 'int':
+        return np.array([-1 if v is None else v for v in values], dtype=np.int64)
+    if kind == 'float':
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if kind == 'bool':
+        return np.array([bool(v) for v in values], dtype=bool)
+    if kind == 'str':
+        return np.array(['' if v is None else v for v in values], dtype=str)
+    if kind == 'datetime':
+        return np.array([np.datetime64('NaT') if v is None else v for v in values], dtype='datetime64[us]')
+    # One json.loads per chunk instead of one per face
+    return np.array(json.loads('[' + ','.join(values) + ']'), dtype=dtype)
+
+def _from_array(kind, array):
+    if kind == 'int':
+        return [None if v < 0 else v for v in array.tolist()]
+    if kind == 'float':
+        return [None if np.isnan(v) else v for v in array.tolist()]
+    if kind == 'bool':
+        return array.tolist()
+    if kind == 'str':
+        return [v or None for v in array.tolist()]
+    if kind == 'datetime':
+        return array.astype('datetime64[us]').tolist()  # NaT becomes None
+    return [json.dumps(row) for row in array.tolist()]
+
+def _write_array(archive, name, array):
+    with archive.open(name, 'w', force_zip64=True) as f:
+        np.lib.format.write_array(f, array, allow_pickle=False)
+
+def _read_array(archive, name):
+    with archive.open(name) as f:
+        return np.lib.format.read_array(f, allow_pickle=False)
+
+def export_encodings(path, chunk_size=10000, dtype=np.float64, on_progress=None):
+    """
+    Write photos, persons and faces to a columnar archive at path.
+    Rows are streamed from the database chunk_size at a time and every chunk
+    is written as its own set of .npy members, so memory stays bounded by the
+    chunk size whatever the library size. The archive is a valid .npz: load it
+    with np.load for offline analysis, e.g. faces.000000.encoding.
+    Returns dict of row counts per table
+    """
+    counts = {}
+    chunks = {}
+    dimension = 0
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for table, model, columns in TABLES:
+            query = db.session.query(*[getattr(model, name) for name, _ in columns])
+            query = query.order_by(model.id).execution_options(yield_per=chunk_size)
+            counts[table] = 0
+            chunks[table] = 0
+            rows = []
+
+            def flush():
+                for i, (name, kind) in enumerate(columns):
+                    array = _to_array(kind, [row[i] for row in rows], dtype)
+                    _write_array(archive, member_name(table, chunks[table], name), array)
+                counts[table] += len(rows)
+                chunks[table] += 1
+                rows.clear()
+                if on_progress:
+                    on_progress(table, counts[table])
+
+            for row in query:
+                rows.append(row)
+                if dimension == 0 and table == 'faces':
+                    dimension = len(json.loads(row.encoding))
+                if len(rows) == chunk_size:
+                    flush()
+            if rows:
+                flush()
+
+        archive.writestr('meta.json', json.dumps({
+            'format': FORMAT,
+            'version': VERSION,
+            'chunk_size': chunk_size,
+            'dimension': dimension,
+            'dtype': np.dtype(dtype).name,
+            'counts': counts,
+            'chunks': chunks
+        }))
+
+    return counts
+
+def read_meta(archive):
+    """Validate an open archive and return its metadata"""
+    try:
+        meta = json.loads(archive.read('meta.json'))
+    except KeyError:
+        raise ValueError('Not an encoding archive: meta.json is missing')
+    if meta.get('format') != FORMAT:
+        raise ValueError(f"Not an encoding archive: format is {meta.get('format')!r}")
+    if meta.get('version', 0) > VERSION:
+        raise ValueError(f"Archive version {meta['version']} is newer than supported version {VERSION}")
+    return meta
+
+def iter_chunks(path, table, columns=None):
+    """
+    Yield the chunks of one table as dicts of column name to array, reading
+    one chunk at a time. columns limits which columns are read.
+    """
+    kinds = dict(next(spec for name, _, spec in TABLES if name == table))
+    with zipfile.ZipFile(path) as archive:
+        meta = read_meta(archive)
+        for chunk in range(meta['chunks'].get(table, 0)):
+            yield {
+                name: _read_array(archive, member_name(table, chunk, name))
+                for name in (columns or kinds)
+            }
+
+def _upsert(model, records):
+    """Update rows whose id already exists and bulk insert the rest"""
+    ids = [record['id'] for record in records]
+    # Chunks are in id order, so one range query finds the existing rows
+    existing = {
+        row.id for row in db.session.query(model.id).filter(model.id.between(min(ids), max(ids)))
+    }
+    db.session.bulk_update_mappings(model, [r for r in records if r['id'] in existing])
+    new = [r for r in records if r['id'] not in existing]
+    db.session.bulk_insert_mappings(model, new)
+    return len(new)
+
+def _sync_sequences():
+    """Move PostgreSQL id sequences past the imported ids"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for _, model, _ in TABLES:
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+        ))
+
+def import_encodings(path, on_progress=None):
+    """
+    Load an archive written by export_encodings, one chunk per transaction.
+    Rows are matched by id: existing rows are updated (so clusters computed
+    offline can be written back by editing person_id and the persons table)
+    and missing rows are inserted. Image files are not part of the archive;
+    photo keys must resolve in the configured storage.
+    Returns dict of {table: {'inserted': n, 'updated': n}}
+    """
+    with zipfile.ZipFile(path) as archive:
+        read_meta(archive)
+
+    result = {}
+    for table, model, columns in TABLES:
+        inserted = updated = 0
+        for arrays in iter_chunks(path, table):
+            values = {name: _from_array(kind, arrays[name]) for name, kind in columns}
+            records = [dict(zip(values, row)) for row in zip(*values.values())]
+            if table == 'persons':
+                # Merge links may point at persons in later chunks; set them afterwards
+                for record in records:
+                    record['merged_into_id'] = None
+
+            added = _upsert(model, records)
+            inserted += added
+            updated += len(records) - added
+            db.session.commit()
+            if on_progress:
+                on_progress(table, inserted + updated)
+        result[table] = {'inserted': inserted, 'updated': updated}
+
+    for arrays in iter_chunks(path, 'persons', columns=['id', 'merged_into_id']):
+        links = [
+            {'id': person_id, 'merged_into_id': merged_into_id}
+            for person_id, merged_into_id in zip(arrays['id'].tolist(), arrays['merged_into_id'].tolist())
+            if merged_into_id >= 0
+        ]
+        db.session.bulk_update_mappings(Person, links)
+        db.session.commit()
+
+    _sync_sequences()
+    db.session.commit()
+    return result
@@ -0,0 +1,215 @@
+import threading
+import json
+import numpy as np
+from models import db, Face
+
+UNASSIGNED = -1
+
+class EncodingIndex:
+    """
+    In-memory matrix of all face encodings for vectorized matching.
+    Rows are loaded lazily from the database on first use and then kept in
+    sync in place by the processing, merge and delete paths, so lookups never
+    go back to the ORM. Call invalidate() after bulk changes made behind the
+    index's back (e.g. regrouping) to force a reload.
+    Faces scored below min_quality are never loaded.
+    """
+
+    def __init__(self, dtype=np.float32, min_quality=0.0):
+        self.dtype = dtype
+        self.min_quality = min_quality
+        self.lock = threading.RLock()  # also held by readers that must see a consistent index
+        self._loaded = False
+        self._listeners = []
+        self._reset(0)
+
+    def _reset(self, dimension, capacity=0):
+        self._size = 0
+        self._face_ids = np.empty(capacity, dtype=np.int64)
+        self._photo_ids = np.empty(capacity, dtype=np.int64)
+        self._person_ids = np.empty(capacity, dtype=np.int64)
+        self._encodings = np.empty((capacity, dimension), dtype=self.dtype)
+        self._sq_norms = np.empty(capacity, dtype=self.dtype)
+
+    def _grow(self, needed):
+        """Grow the backing arrays geometrically so appends are amortized O(1)"""
+        capacity = len(self._face_ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        self._face_ids = np.resize(self._face_ids, new_capacity)
+        self._photo_ids = np.resize(self._photo_ids, new_capacity)
+        self._person_ids = np.resize(self._person_ids, new_capacity)
+        self._sq_norms = np.resize(self._sq_norms, new_capacity)
+        encodings = np.empty((new_capacity, self._encodings.shape[1]), dtype=self.dtype)
+        encodings[:self._size] = self._encodings[:self._size]
+        self._encodings = encodings
+
+    def add_listener(self, callback):
+        """
+        Register callback(person_ids, added) to be told which persons changed;
+        person_ids is None when everything must be treated as changed, and
+        added is the encoding when the change is a single appended face
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, person_ids, added=None):
+        for callback in self._listeners:
+            callback(person_ids, added)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def invalidate(self):
+        """Drop the in-memory copy; it is reloaded on next use"""
+        with self.lock:
+            self._loaded = False
+            self._reset(0)
+            self._notify(None)
+
+    def ensure_loaded(self):
+        """Load all face encodings from the database if not loaded yet"""
+        with self.lock:
+            if self._loaded:
+                return
+
+            rows = db.session.query(Face.id, Face.photo_id, Face.person_id, Face.encoding).filter(
+                db.or_(Face.quality.is_(None), Face.quality >= self.min_quality)
+            ).all()
+            dimension = len(json.loads(rows[0].encoding)) if rows else 0
+            self._reset(dimension, len(rows))
+
+            for i, row in enumerate(rows):
+                self._face_ids[i] = row.id
+                self._photo_ids[i] = row.photo_id
+                self._person_ids[i] = row.person_id if row.person_id is not None else UNASSIGNED
+                self._encodings[i] = json.loads(row.encoding)
+
+            self._sq_norms[:len(rows)] = np.einsum('ij,ij->i', self._encodings, self._encodings)
+            self._size = len(rows)
+            self._loaded = True
+            self._notify(None)
+
+    def load_arrays(self, face_ids, photo_ids, person_ids, encodings):
+        """Replace the index contents with prebuilt arrays (person_id -1 means unassigned)"""
+        with self.lock:
+            encodings = np.asarray(encodings, dtype=self.dtype)
+            self._reset(encodings.shape[1], len(encodings))
+            self._face_ids[:] = face_ids
+            self._photo_ids[:] = photo_ids
+            self._person_ids[:] = person_ids
+            self._encodings[:] = encodings
+            self._sq_norms[:] = np.einsum('ij,ij->i', encodings, encodings)
+            self._size = len(encodings)
+            self._loaded = True
+            self._notify(None)
+
+    def add(self, face_id, photo_id, person_id, encoding):
+        """Append a face; ignored until the index is loaded since loading picks it up"""
+        with self.lock:
+            if not self._loaded:
+                return
+
+            encoding = np.asarray(encoding, dtype=self.dtype)
+            if self._encodings.shape[1] == 0:
+                self._encodings = np.empty((len(self._face_ids), len(encoding)), dtype=self.dtype)
+
+            self._grow(self._size + 1)
+            i = self._size
+            self._face_ids[i] = face_id
+            self._photo_ids[i] = photo_id
+            self._person_ids[i] = person_id if person_id is not None else UNASSIGNED
+            self._encodings[i] = encoding
+            self._sq_norms[i] = encoding @ encoding
+            self._size += 1
+
+            if person_id is not None:
+                self._notify([person_id], encoding)
+
+    def reassign_persons(self, old_person_ids, new_person_id):
+        """Move every face of old_person_ids to new_person_id"""
+        with self.lock:
+            if not self._loaded:
+                return
+
+            person_ids = self._person_ids[:self._size]
+            person_ids[np.isin(person_ids, list(old_person_ids))] = new_person_id
+            self._notify(list(old_person_ids) + [new_person_id])
+
+    def remove_photo(self, photo_id):
+        """Drop all faces of a photo"""
+        with self.lock:
+            if not self._loaded:
+                return
+
+            keep = self._photo_ids[:self._size] != photo_id
+            kept = int(keep.sum())
+            if kept == self._size:
+                return
+
+            removed_person_ids = np.unique(self._person_ids[:self._size][~keep])
+
+            self._face_ids[:kept] = self._face_ids[:self._size][keep]
+            self._photo_ids[:kept] = self._photo_ids[:self._size][keep]
+            self._person_ids[:kept] = self._person_ids[:self._size][keep]
+            self._encodings[:kept] = self._encodings[:self._size][keep]
+            self._sq_norms[:kept] = self._sq_norms[:self._size][keep]
+            self._size = kept
+            self._notify(removed_person_ids[removed_person_ids != UNASSIGNED])
+
+    def person_encodings(self, person_id):
+        """Encodings of every face of one person"""
+        with self.lock:
+            self.ensure_loaded()
+            return self._encodings[:self._size][self._person_ids[:self._size] == person_id]
+
+    def snapshot(self):
+        """
+        Consistent view of the assigned faces
+        Returns (face_ids, photo_ids, person_ids, encodings)
+        """
+        with self.lock:
+            self.ensure_loaded()
+            assigned = self._person_ids[:self._size] != UNASSIGNED
+            return (
+                self._face_ids[:self._size][assigned],
+                self._photo_ids[:self._size][assigned],
+                self._person_ids[:self._size][assigned],
+                self._encodings[:self._size][assigned]
+            )
+
+    def nearest(self, encoding, k=1, max_distance=None):
+        """
+        Find the k assigned faces closest to an encoding
+        Returns (face_ids, photo_ids, person_ids, distances) sorted by distance
+        """
+        with self.lock:
+            self.ensure_loaded()
+            size = self._size
+            if size == 0:
+                empty = np.empty(0, dtype=np.int64)
+                return empty, empty, empty, np.empty(0, dtype=self.dtype)
+
+            # ||a - q||^2 = ||a||^2 - 2 a.q + ||q||^2 turns the scan into one matrix-vector product
+            query = np.asarray(encoding, dtype=self.dtype)
+            sq_distances = self._sq_norms[:size] - 2 * (self._encodings[:size] @ query) + query @ query
+            sq_distances[self._person_ids[:size] == UNASSIGNED] = np.inf
+
+            if k is not None and k < size:
+                order = np.argpartition(sq_distances, k)[:k]
+                order = order[np.argsort(sq_distances[order])]
+            else:
+                order = np.argsort(sq_distances)
+
+            order = order[np.isfinite(sq_distances[order])]
+            distances = np.sqrt(np.maximum(sq_distances[order], 0))
+
+            if max_distance is not None:
+                within = distances <= max_distance
+                order, distances = order[within], distances[within]
+
+            return self._face_ids[order], self._photo_ids[order], self._person_ids[order], distances
@@ -0,0 +1,71 @@
+import json
+import queue
+import threading
+from collections import deque
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for progress events.
+    Processing workers publish; each Server-Sent Events client gets its own
+    bounded queue. Recent events are kept in a ring buffer so a reconnecting
+    client can resume from its Last-Event-ID without missing anything.
+    """
+
+    def __init__(self, history=500, max_pending=1000):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        self._max_pending = max_pending
+        self._last_id = 0
+
+    def publish(self, event_type, data):
+        """Send an event to every subscriber"""
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A client that stopped reading must not grow memory without bound
+                self.unsubscribe(subscriber)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a subscriber, replaying buffered events newer than last_event_id
+        Returns the subscriber's queue of (id, type, data) tuples
+        """
+        subscriber = queue.Queue(maxsize=self._max_pending)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event[0] > last_event_id:
+                        subscriber.put_nowait(event)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, subscriber, heartbeat=15):
+        """
+        Yield Server-Sent Events from a subscriber's queue, with a comment line
+        every heartbeat seconds so proxies keep the connection open
+        """
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event_id, event_type, data = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    if subscriber not in self._subscribers:
+                        return  # dropped for falling behind; the client reconnects and replays
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
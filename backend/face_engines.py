@@ -0,0 +1,238 @@
+import os
+import random
+import numpy as np
+from PIL import Image
+
+class FaceEngine:
+    """
+    Base class for face detection engines.
+    An engine only turns pixels into face locations and encodings; persistence,
+    matching and grouping live in FaceProcessor so every engine runs through
+    the same pipeline.
+    """
+
+    name = None
+
+    def load_image(self, source, max_dimension=None):
+        """
+        Load an image from a path or file-like object as an RGB uint8 array,
+        optionally downscaled so neither side exceeds max_dimension
+        """
+        with Image.open(source) as img:
+            img = img.convert('RGB')
+            if max_dimension:
+                img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            return np.array(img)
+
+    def detect(self, image):
+        """
+        Detect faces in an RGB image
+        Returns list of (top, right, bottom, left) tuples
+        """
+        raise NotImplementedError
+
+    def encode(self, image, face_locations):
+        """
+        Compute one encoding per face location
+        Returns list of 1-D numpy arrays
+        """
+        raise NotImplementedError
+
+    def landmarks(self, image, face_locations):
+        """
+        Eye and nose positions per face, as dicts with 'left_eye', 'right_eye'
+        and 'nose_tip' point lists, used for quality scoring
+        Returns None if the engine has no landmark model
+        """
+        return None
+
+    def detect_and_encode(self, image):
+        """
+        Detect all faces in an image and encode them
+        Returns (face_locations, face_encodings)
+        """
+        face_locations = self.detect(image)
+        if not face_locations:
+            return [], []
+        return face_locations, self.encode(image, face_locations)
+
+class DlibEngine(FaceEngine):
+    """
+    face_recognition (dlib) engine: HOG or CNN detector with the 128-d ResNet encoder
+    """
+
+    name = 'dlib'
+
+    def __init__(self, model='hog', num_jitters=1):
+        import face_recognition
+        self._fr = face_recognition
+        self.model = model
+        self.num_jitters = num_jitters
+
+    def detect(self, image):
+        return self._fr.face_locations(image, model=self.model)
+
+    def encode(self, image, face_locations):
+        return self._fr.face_encodings(image, face_locations, num_jitters=self.num_jitters)
+
+    def landmarks(self, image, face_locations):
+        return self._fr.face_landmarks(image, face_locations, model='small')
+
+class OpenCVEngine(FaceEngine):
+    """
+    OpenCV engine for CPU-only hosts without dlib.
+    Detection uses the bundled Haar cascade, or the res10 SSD DNN when model
+    files are configured. Encoding uses SFace when a model is configured and
+    otherwise falls back to a coarse appearance descriptor (normalized 16x8
+    grayscale crop), which is cheap but much less discriminative than dlib;
+    tune the tolerance for it accordingly.
+    """
+
+    name = 'opencv'
+
+    def __init__(self, detector='haar', dnn_model=None, dnn_config=None,
+                 sface_model=None, min_confidence=0.6):
+        import cv2
+        self._cv2 = cv2
+        self.detector = detector
+        self.min_confidence = min_confidence
+
+        if detector == 'dnn':
+            if not dnn_model or not dnn_config:
+                raise ValueError('OpenCV DNN detector requires dnn_model and dnn_config')
+            self._net = cv2.dnn.readNetFromCaffe(dnn_config, dnn_model)
+        elif detector == 'haar':
+            cascade_path = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+            self._cascade = cv2.CascadeClassifier(cascade_path)
+        else:
+            raise ValueError(f"Unknown OpenCV detector: {detector}")
+
+        self._sface = cv2.FaceRecognizerSF.create(sface_model, '') if sface_model else None
+
+    def detect(self, image):
+        height, width = image.shape[:2]
+
+        if self.detector == 'dnn':
+            bgr = self._cv2.cvtColor(image, self._cv2.COLOR_RGB2BGR)
+            blob = self._cv2.dnn.blobFromImage(
+                self._cv2.resize(bgr, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0)
+            )
+            self._net.setInput(blob)
+            detections = self._net.forward()[0, 0]
+
+            face_locations = []
+            for detection in detections:
+                if detection[2] < self.min_confidence:
+                    continue
+                left, top, right, bottom = (detection[3:7] * [width, height, width, height]).astype(int)
+                top, left = max(0, top), max(0, left)
+                bottom, right = min(height, bottom), min(width, right)
+                if bottom > top and right > left:
+                    face_locations.append((int(top), int(right), int(bottom), int(left)))
+            return face_locations
+
+        gray = self._cv2.cvtColor(image, self._cv2.COLOR_RGB2GRAY)
+        rects = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40))
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in rects]
+
+    def encode(self, image, face_locations):
+        encodings = []
+
+        for top, right, bottom, left in face_locations:
+            crop = image[top:bottom, left:right]
+
+            if self._sface is not None:
+                bgr = self._cv2.cvtColor(crop, self._cv2.COLOR_RGB2BGR)
+                feature = self._sface.feature(self._cv2.resize(bgr, (112, 112))).flatten()
+            else:
+                gray = self._cv2.equalizeHist(self._cv2.cvtColor(crop, self._cv2.COLOR_RGB2GRAY))
+                feature = self._cv2.resize(gray, (16, 8), interpolation=self._cv2.INTER_AREA).flatten()
+                feature = feature.astype(np.float64) - feature.mean()
+
+            norm = np.linalg.norm(feature)
+            encodings.append(feature.astype(np.float64) / norm if norm > 0 else feature.astype(np.float64))
+
+        return encodings
+
+class MockEngine(FaceEngine):
+    """
+    Mock engine for development/demo purposes.
+    Generates 1-3 random face boxes per image. Encodings are drawn around a
+    fixed pool of fake identities, so the real matching and clustering code
+    produces plausible albums without face_recognition installed.
+    """
+
+    name = 'mock'
+
+    def __init__(self, num_identities=12, seed=42):
+        rng = np.random.default_rng(seed)
+        self.identities = rng.normal(0, 0.1, size=(num_identities, 128))
+
+    def detect(self, image):
+        height, width = image.shape[:2]
+        if min(width, height) < 150:
+            return []
+
+        face_locations = []
+        for i in range(random.randint(1, 3)):
+            face_size = random.randint(50, min(width, height) // 3)
+            top = random.randint(0, max(0, height - face_size))
+            left = random.randint(0, max(0, width - face_size))
+            bottom = min(top + face_size, height)
+            right = min(left + face_size, width)
+            face_locations.append((top, right, bottom, left))
+        return face_locations
+
+    def encode(self, image, face_locations):
+        encodings = []
+        for _ in face_locations:
+            identity = self.identities[random.randrange(len(self.identities))]
+            encodings.append(identity + np.random.normal(0, 0.02, size=identity.shape))
+        return encodings
+
+    def landmarks(self, image, face_locations):
+        landmarks = []
+        for top, right, bottom, left in face_locations:
+            width, height = right - left, bottom - top
+            yaw = random.uniform(-0.3, 0.3)  # nose offset as a fraction of face width
+            eye_y = top + height * 0.4
+            landmarks.append({
+                'left_eye': [(left + width * 0.3, eye_y)],
+                'right_eye': [(left + width * 0.7, eye_y)],
+                'nose_tip': [(left + width * (0.5 + yaw), top + height * 0.65)]
+            })
+        return landmarks
+
+ENGINES = {
+    'dlib': DlibEngine,
+    'opencv': OpenCVEngine,
+    'mock': MockEngine,
+}
+
+def create_engine(name, **options):
+    """
+    Create a face engine by name
+    """
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown face engine: {name}")
+    return engine_class(**options)
+
+def create_engine_from_config(config, name=None):
+    """
+    Create the face engine selected in the app config
+    """
+    name = name or config['FACE_ENGINE']
+
+    if name == 'dlib':
+        return create_engine(name, model=config['FACE_RECOGNITION_MODEL'])
+    if name == 'opencv':
+        return create_engine(
+            name,
+            detector=config['OPENCV_FACE_DETECTOR'],
+            dnn_model=config['OPENCV_DNN_MODEL'],
+            dnn_config=config['OPENCV_DNN_CONFIG'],
+            sface_model=config['OPENCV_SFACE_MODEL']
+        )
+    return create_engine(name)
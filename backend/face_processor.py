@@ -1,16 +1,42 @@
-import face_recognition
 import cv2
 import numpy as np
-from PIL import Image
-import os
-from sklearn.cluster import DBSCAN
 from models import db, Photo, Person, Face
-import json
+from encoding_index import EncodingIndex
+from prototypes import PrototypeIndex
+from face_quality import score_faces
+from clustering import cluster_encodings, check_params
+import stats
 
 class FaceProcessor:
-    def __init__(self, tolerance=0.6, model='hog'):
+    """
+    Engine-independent face pipeline: persistence, matching, grouping and merging.
+    Detection and encoding are delegated to a FaceEngine (see face_engines.py).
+    """
+    
+    def __init__(self, engine, tolerance=0.6, min_quality=0.0, exemplars=4,
+                 clustering='dbscan', clustering_params=None):
+        self.engine = engine
         self.tolerance = tolerance
-        self.model = model
+        self.clustering = clustering
+        self.clustering_params = {'threshold': tolerance, **(clustering_params or {})}
+        check_params(clustering, self.clustering_params)
+        self.min_quality = min_quality
+        self.index = EncodingIndex(min_quality=min_quality)
+        self.prototypes = PrototypeIndex(self.index, exemplars=exemplars)
+    
+    def detect_faces(self, photo_path):
+        """
+        Run the engine on a photo without touching the database
+        Returns (face_locations, face_encodings, face_qualities)
+        """
+        image = self.engine.load_image(photo_path)
+        face_locations, face_encodings = self.engine.detect_and_encode(image)
+        face_qualities = score_faces(image, face_locations, self.engine.landmarks(image, face_locations))
+        return face_locations, face_encodings, face_qualities
+    
+    def is_usable(self, quality):
+        """Whether a face is good enough to match against and cluster (unscored faces are)"""
+        return quality is None or quality >= self.min_quality
     
     def process_photo(self, photo_path, photo_id):
         """
@@ -18,52 +44,71 @@ class FaceProcessor:
         Returns list of face data
         """
         try:
-            # Load image
-            image = face_recognition.load_image_file(photo_path)
-            
-            # Find face locations and encodings
-            face_locations = face_recognition.face_locations(image, model=self.model)
-            face_encodings = face_recognition.face_encodings(image, face_locations)
-            
-            faces_data = []
-            
-            for (top, right, bottom, left), encoding in zip(face_locations, face_encodings):
-                # Create face record
-                face = Face(
-                    photo_id=photo_id,
-                    top=top,
-                    right=right,
-                    bottom=bottom,
-                    left=left
-                )
-                face.set_encoding(encoding)
-                
-                db.session.add(face)
-                faces_data.append({
-                    'face': face,
-                    'encoding': encoding,
-                    'location': (top, right, bottom, left)
-                })
-            
-            # Mark photo as processed
-            photo = Photo.query.get(photo_id)
-            if photo:
-                photo.processed = True
-            
-            db.session.commit()
-            return faces_data
+            face_locations, face_encodings, face_qualities = self.detect_faces(photo_path)
+            return self.save_faces(photo_id, face_locations, face_encodings, face_qualities)
             
         except Exception as e:
             print(f"Error processing photo {photo_id}: {str(e)}")
+            db.session.rollback()
             return []
     
+    def save_faces(self, photo_id, face_locations, face_encodings, face_qualities=None):
+        """
+        Persist detected faces for a photo and mark it as processed
+        Returns list of face data
+        """
+        faces_data = []
+        if face_qualities is None:
+            face_qualities = [None] * len(face_locations)
+        
+        for (top, right, bottom, left), encoding, quality in zip(face_locations, face_encodings, face_qualities):
+            # Create face record
+            face = Face(
+                photo_id=photo_id,
+                top=top,
+                right=right,
+                bottom=bottom,
+                left=left,
+                quality=quality
+            )
+            face.set_encoding(encoding)
+            
+            db.session.add(face)
+            faces_data.append({
+                'face': face,
+                'encoding': encoding,
+                'location': (top, right, bottom, left)
+            })
+        
+        # Mark photo as processed
+        photo = Photo.query.get(photo_id)
+        if photo:
+            stats.increment(processed_photos=0 if photo.processed else 1)
+            photo.processed = True
+        
+        stats.increment(total_faces=len(faces_data))
+        db.session.commit()
+        return faces_data
+    
     def group_faces(self):
         """
-        Group all unassigned faces using clustering
+        Group all unassigned faces: usable faces are clustered, then low-quality
+        faces join the person they match, as at ingest
+        """
+        self.cluster_usable_faces()
+        self.attach_low_quality_faces()
+    
+    def cluster_usable_faces(self):
+        """
+        Cluster unassigned usable faces into new persons
+        Low-quality faces are left out so they cannot bridge clusters
         """
         try:
-            # Get all faces without person assignment
-            unassigned_faces = Face.query.filter_by(person_id=None).all()
+            # Get all usable faces without person assignment
+            unassigned_faces = Face.query.filter(
+                Face.person_id.is_(None),
+                db.or_(Face.quality.is_(None), Face.quality >= self.min_quality)
+            ).all()
             
             if len(unassigned_faces) < 2:
                 # If less than 2 faces, create individual persons
@@ -72,7 +117,9 @@ class FaceProcessor:
                     db.session.add(person)
                     db.session.flush()
                     face.person_id = person.id
+                stats.increment(total_persons=len(unassigned_faces))
                 db.session.commit()
+                self.index.invalidate()
                 return
             
             # Extract encodings
@@ -90,9 +137,8 @@ class FaceProcessor:
             if len(encodings) < 2:
                 return
             
-            # Use DBSCAN clustering
-            clustering = DBSCAN(eps=self.tolerance, min_samples=1, metric='euclidean')
-            cluster_labels = clustering.fit_predict(encodings)
+            # Cluster with the configured algorithm (see clustering.py)
+            cluster_labels = cluster_encodings(encodings, self.clustering, **self.clustering_params)
             
             # Create persons for each cluster
             cluster_to_person = {}
@@ -110,93 +156,181 @@ class FaceProcessor:
                 
                 face.person_id = cluster_to_person[cluster_label]
             
+            stats.increment(total_persons=len(cluster_to_person))
             db.session.commit()
+            self.index.invalidate()
             
         except Exception as e:
             print(f"Error grouping faces: {str(e)}")
             db.session.rollback()
     
-    def match_face_to_existing_persons(self, face_encoding):
+    def attach_low_quality_faces(self):
         """
-        Try to match a face encoding to existing persons
-        Returns person_id if match found, None otherwise
+        Assign unassigned low-quality faces to the person they match, if any.
+        They never start a person and stay out of the index, like at ingest,
+        but without this a regroup would drop them from their albums.
+        Returns the number of faces attached
         """
         try:
-            # Get all existing persons with their representative faces
-            persons = Person.query.filter_by(is_merged=False).all()
+            faces = Face.query.filter(Face.person_id.is_(None), Face.quality < self.min_quality).all()
+            attached = 0
             
-            for person in persons:
-                if not person.faces:
-                    continue
-                
-                # Compare with all faces of this person
-                for existing_face in person.faces:
-                    try:
-                        existing_encoding = existing_face.get_encoding()
-                        distance = face_recognition.face_distance([existing_encoding], face_encoding)[0]
-                        
-                        if distance <= self.tolerance:
-                            return person.id
-                    except:
-                        continue
+            for face in faces:
+                person_id = self.match_face_to_existing_persons(face.get_encoding())
+                if person_id:
+                    face.person_id = person_id
+                    attached += 1
             
-            return None
+            db.session.commit()
+            return attached
+            
+        except Exception as e:
+            print(f"Error attaching low-quality faces: {str(e)}")
+            db.session.rollback()
+            return 0
+    
+    def match_face_to_existing_persons(self, face_encoding):
+        """
+        Try to match a face encoding to existing persons by their prototypes
+        Returns person_id if match found, None otherwise
+        """
+        try:
+            person_ids, _ = self.prototypes.nearest(face_encoding, k=1, max_distance=self.tolerance)
+            return int(person_ids[0]) if len(person_ids) else None
             
         except Exception as e:
             print(f"Error matching face: {str(e)}")
             return None
     
+    def search_face(self, image_source, limit=10, max_distance=None):
+        """
+        Find the persons and faces closest to the largest face in an image,
+        without persisting anything
+        Returns dict with 'faces' and 'persons' lists sorted by distance, or None if no face found
+        """
+        image = self.engine.load_image(image_source, max_dimension=1024)
+        face_locations, face_encodings = self.engine.detect_and_encode(image)
+        if not face_locations:
+            return None
+        
+        # Use the largest face, which is almost always the selfie subject
+        areas = [(bottom - top) * (right - left) for top, right, bottom, left in face_locations]
+        encoding = face_encodings[int(np.argmax(areas))]
+        
+        max_distance = self.tolerance if max_distance is None else max_distance
+        face_ids, photo_ids, person_ids, distances = self.index.nearest(encoding, k=limit, max_distance=max_distance)
+        
+        faces = [
+            {'face_id': int(f), 'photo_id': int(p), 'person_id': int(pid), 'distance': float(d)}
+            for f, p, pid, d in zip(face_ids, photo_ids, person_ids, distances)
+        ]
+        
+        # Rank persons by their prototypes rather than deduping the nearest
+        # faces, which a person with many near-identical faces would fill
+        person_ids, distances = self.prototypes.nearest(encoding, k=limit, max_distance=max_distance)
+        persons = [
+            {'person_id': int(pid), 'distance': float(d)}
+            for pid, d in zip(person_ids, distances)
+        ]
+        
+        return {'faces': faces, 'persons': persons}
+    
     def process_and_group_photo(self, photo_path, photo_id):
         """
         Process a photo and immediately try to group faces with existing persons
         """
         faces_data = self.process_photo(photo_path, photo_id)
+        return self.group_new_faces(photo_id, faces_data)
+    
+    def group_new_faces(self, photo_id, faces_data):
+        """
+        Assign freshly saved faces to matching persons, creating new persons as needed.
+        Low-quality faces join a person they match but never start a new one,
+        and are kept out of the index.
+        Returns the number of faces grouped
+        """
+        try:
+            for face_data in faces_data:
+                face = face_data['face']
+                encoding = face_data['encoding']
+                usable = self.is_usable(face.quality)
+                
+                # Try to match with existing persons
+                person_id = self.match_face_to_existing_persons(encoding)
+                
+                if person_id:
+                    face.person_id = person_id
+                elif not usable:
+                    continue
+                else:
+                    # Create new person
+                    person = Person(name=f"Person {Person.query.count() + 1}")
+                    db.session.add(person)
+                    db.session.flush()
+                    face.person_id = person.id
+                    stats.increment(total_persons=1)
+                
+                if usable:
+                    self.index.add(face.id, photo_id, face.person_id, encoding)
+            
+            db.session.commit()
+            
+        except Exception:
+            db.session.rollback()
+            self.index.invalidate()
+            raise
         
-        for face_data in faces_data:
-            face = face_data['face']
-            encoding = face_data['encoding']
-            
-            # Try to match with existing persons
-            person_id = self.match_face_to_existing_persons(encoding)
-            
-            if person_id:
-                face.person_id = person_id
-            else:
-                # Create new person
-                person = Person(name=f"Person {Person.query.count() + 1}")
-                db.session.add(person)
-                db.session.flush()
-                face.person_id = person.id
-        
-        db.session.commit()
         return len(faces_data)
     
-    def merge_persons(self, person_id_1, person_id_2):
+    def resolve_person_id(self, person_id):
         """
-        Merge two persons into one
+        Follow the merged_into chain to the surviving person (see Person.resolve_id)
+        Returns the surviving person_id, or None if the person does not exist
+        """
+        return Person.resolve_id(person_id)
+    
+    def merge_persons(self, target_id, source_ids):
+        """
+        Merge one or more persons into target_id with bulk updates
+        Returns the surviving person_id, or None on failure
         """
         try:
-            person1 = Person.query.get(person_id_1)
-            person2 = Person.query.get(person_id_2)
+            target_id = self.resolve_person_id(target_id)
+            if target_id is None:
+                return None
             
-            if not person1 or not person2:
-                return False
+            resolved = {self.resolve_person_id(person_id) for person_id in source_ids}
+            if None in resolved:
+                return None
+            resolved.discard(target_id)
             
-            # Move all faces from person2 to person1
-            for face in person2.faces:
-                face.person_id = person1.id
-            
-            # Mark person2 as merged
-            person2.is_merged = True
-            person2.merged_into_id = person1.id
+            if resolved:
+                source_ids = list(resolved)
+                
+                # Move all faces of the sources in one statement
+                Face.query.filter(Face.person_id.in_(source_ids)).update(
+                    {'person_id': target_id}, synchronize_session=False
+                )
+                
+                # Re-point persons previously merged into a source so chains stay one hop long
+                Person.query.filter(Person.merged_into_id.in_(source_ids)).update(
+                    {'merged_into_id': target_id}, synchronize_session=False
+                )
+                Person.query.filter(Person.id.in_(source_ids)).update(
+                    {'is_merged': True, 'merged_into_id': target_id}, synchronize_session=False
+                )
+                
+                stats.increment(total_persons=-len(source_ids))
+                db.session.commit()
+                db.session.expire_all()
+                self.index.reassign_persons(source_ids, target_id)
             
-            db.session.commit()
-            return True
+            return target_id
             
         except Exception as e:
             print(f"Error merging persons: {str(e)}")
             db.session.rollback()
-            return False
+            return None
     
     def extract_face_image(self, photo_path, face_location, output_path):
         """
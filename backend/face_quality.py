@@ -0,0 +1,84 @@
+import numpy as np
+
+SAMPLE_SIZE = 64  # faces are resampled to this many pixels per side before scoring
+MIN_GOOD_SIZE = 80  # faces at least this many pixels on the short side get full size score
+SHARPNESS_SCALE = 100.0  # Laplacian variance that scores 0.5
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def sample_faces(image, face_locations, size=SAMPLE_SIZE):
+    """
+    Nearest-neighbour resample every face box to size x size grayscale in one
+    fancy-indexing step, touching only the sampled pixels of the image
+    Returns float32 array of shape (faces, size, size)
+    """
+    boxes = np.asarray(face_locations, dtype=np.float32).reshape(-1, 4)
+    top, right, bottom, left = boxes.T
+    steps = (np.arange(size, dtype=np.float32) + 0.5) / size
+
+    rows = (top[:, None] + steps[None, :] * (bottom - top)[:, None]).astype(np.intp)
+    cols = (left[:, None] + steps[None, :] * (right - left)[:, None]).astype(np.intp)
+    rows = np.clip(rows, 0, image.shape[0] - 1)
+    cols = np.clip(cols, 0, image.shape[1] - 1)
+
+    crops = image[rows[:, :, None], cols[:, None, :]].astype(np.float32)
+    if crops.ndim == 4:
+        crops = crops @ GRAY_WEIGHTS
+    return crops
+
+def size_scores(face_locations):
+    boxes = np.asarray(face_locations, dtype=np.float32).reshape(-1, 4)
+    short_side = np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 1] - boxes[:, 3])
+    return np.clip(short_side / MIN_GOOD_SIZE, 0, 1)
+
+def sharpness_scores(crops):
+    """Variance of the 4-neighbour Laplacian of each crop, mapped to [0, 1)"""
+    laplacian = (4 * crops[:, 1:-1, 1:-1] - crops[:, :-2, 1:-1] - crops[:, 2:, 1:-1]
+                 - crops[:, 1:-1, :-2] - crops[:, 1:-1, 2:])
+    variance = laplacian.reshape(len(crops), -1).var(axis=1)
+    return variance / (variance + SHARPNESS_SCALE)
+
+def landmark_symmetry_scores(landmarks):
+    """
+    How centred the nose is between the eyes: 1 for a frontal face, falling
+    towards 0 as the head turns to profile
+    """
+    eyes_left = np.array([np.mean(marks['left_eye'], axis=0) for marks in landmarks], dtype=np.float32)
+    eyes_right = np.array([np.mean(marks['right_eye'], axis=0) for marks in landmarks], dtype=np.float32)
+    noses = np.array([np.mean(marks['nose_tip'], axis=0) for marks in landmarks], dtype=np.float32)
+
+    to_left = np.linalg.norm(noses - eyes_left, axis=1)
+    to_right = np.linalg.norm(noses - eyes_right, axis=1)
+    total = to_left + to_right
+    return np.where(total > 0, 1 - np.abs(to_left - to_right) / np.maximum(total, 1e-6), 0)
+
+def mirror_symmetry_scores(crops):
+    """
+    Correlation between each crop and its mirror image, for engines without
+    landmarks; frontal faces are close to left-right symmetric
+    """
+    flat = crops.reshape(len(crops), -1)
+    mirrored = crops[:, :, ::-1].reshape(len(crops), -1)
+    flat = flat - flat.mean(axis=1, keepdims=True)
+    mirrored = mirrored - mirrored.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(flat, axis=1) * np.linalg.norm(mirrored, axis=1)
+    correlation = np.einsum('ij,ij->i', flat, mirrored) / np.maximum(norms, 1e-6)
+    return np.clip(correlation, 0, 1)
+
+def score_faces(image, face_locations, landmarks=None):
+    """
+    Score every face in an image from 0 (junk) to 1 (large, sharp, frontal).
+    The score is the product of the size, sharpness and symmetry scores, so a
+    face that fails any one of them scores low.
+    Returns list of floats, one per face location
+    """
+    if not len(face_locations):
+        return []
+
+    crops = sample_faces(image, face_locations)
+    if landmarks is not None and len(landmarks) == len(face_locations):
+        symmetry = landmark_symmetry_scores(landmarks)
+    else:
+        symmetry = mirror_symmetry_scores(crops)
+
+    quality = size_scores(face_locations) * sharpness_scores(crops) * symmetry
+    return [round(float(score), 4) for score in quality]
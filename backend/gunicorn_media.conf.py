@@ -0,0 +1,14 @@
+# Gunicorn settings for the media tier (media_app.py)
+import os
+
+bind = os.environ.get('MEDIA_BIND') or '0.0.0.0:12002'
+
+# gevent workers multiplex many slow downloads per process; files are sent
+# with sendfile and album ZIPs are streamed, so a worker holds no file in memory
+worker_class = 'gevent'
+workers = int(os.environ.get('MEDIA_WORKERS') or 2)
+worker_connections = int(os.environ.get('MEDIA_WORKER_CONNECTIONS') or 1000)
+sendfile = True
+
+timeout = 60
+keepalive = 5
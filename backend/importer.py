@@ -0,0 +1,246 @@
+import os
+import time
+import uuid
+import shutil
+import tarfile
+import zipfile
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from models import db
+from face_engines import create_engine_from_config
+from face_quality import score_faces
+from ingest import prepare_file, create_photo
+from storage import create_storage
+from utils import allowed_file, generate_unique_filename, sanitize_filename
+
+def iter_source_members(source, max_file_size):
+    """
+    Lazily yield (name, open_member) for every image in a ZIP/TAR archive or
+    directory tree. Members are opened one at a time, never extracted up front.
+    """
+    if os.path.isdir(source):
+        for root, _, names in os.walk(source):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                if allowed_file(name) and os.path.getsize(path) <= max_file_size:
+                    yield name, lambda path=path: open(path, 'rb')
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and allowed_file(info.filename) and info.file_size <= max_file_size:
+                    yield info.filename, lambda info=info: archive.open(info)
+
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, 'r|*') as archive:
+            # Stream mode: members must be read in order, before moving on
+            for info in archive:
+                if info.isfile() and allowed_file(info.name) and info.size <= max_file_size:
+                    yield info.name, lambda info=info: archive.extractfile(info)
+
+    else:
+        raise ValueError(f"Not a directory, ZIP or TAR archive: {source}")
+
+_worker_engine = None
+_worker_storage = None
+
+def _init_worker(worker_config):
+    global _worker_engine, _worker_storage
+    _worker_engine = create_engine_from_config(worker_config)
+    _worker_storage = create_storage(worker_config)
+
+def prepare_and_detect(file_path):
+    """
+    Worker-process half of an import: run face detection on the staged file,
+    then validate, thumbnail and move it into storage
+    Returns (photo attributes, face_locations, face_encodings as lists, face_qualities), or None if invalid
+    """
+    try:
+        image = _worker_engine.load_image(file_path)
+        face_locations, face_encodings = _worker_engine.detect_and_encode(image)
+        face_qualities = score_faces(image, face_locations, _worker_engine.landmarks(image, face_locations))
+    except Exception:
+        face_locations, face_encodings, face_qualities = [], [], []  # prepare_file rejects undecodable files
+
+    attributes = prepare_file(file_path, _worker_storage)
+    if attributes is None:
+        return None
+    return attributes, list(face_locations), [encoding.tolist() for encoding in face_encodings], face_qualities
+
+class ImportJob:
+    """Progress of one bulk import"""
+
+    def __init__(self, source):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.status = 'running'
+        self.error = None
+        self.found = 0
+        self.imported = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.faces = 0
+        self.started = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        elapsed = (self.finished or time.time()) - self.started
+        return {
+            'id': self.id,
+            'source': self.source,
+            'status': self.status,
+            'error': self.error,
+            'found': self.found,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'duplicates': self.duplicates,
+            'failed': self.failed,
+            'faces': self.faces,
+            'elapsed_seconds': round(elapsed, 1),
+            'photos_per_second': round(self.imported / elapsed, 2) if elapsed > 0 else 0
+        }
+
+class Importer:
+    """
+    Imports a whole archive or directory of photos.
+    Members are streamed to the staging folder one at a time and handed to a
+    process pool that validates, thumbnails, stores and runs face detection on every
+    core; the parent process only does the database writes and grouping.
+    At most two tasks per worker are in flight, so memory and disk use stay
+    bounded however large the archive is. Finished jobs are kept for job_ttl
+    seconds so their progress can still be read.
+    """
+
+    def __init__(self, app, face_processor, workers=None, events=None, job_ttl=3600):
+        self.app = app
+        self.face_processor = face_processor
+        self.events = events
+        self.workers = workers or os.cpu_count() or 1
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+
+    def start(self, source):
+        """Run an import in a background thread; returns the ImportJob"""
+        job = ImportJob(source)
+        with self._jobs_lock:
+            expired = time.time() - self.job_ttl
+            self.jobs = {
+                job_id: other for job_id, other in self.jobs.items()
+                if other.finished is None or other.finished > expired
+            }
+            self.jobs[job.id] = job
+        thread = threading.Thread(target=self.run, args=(job,))
+        thread.daemon = True
+        thread.start()
+        return job
+
+    def run(self, job, on_progress=None):
+        """Run an import to completion in the calling thread"""
+        config = self.app.config
+        staging_folder = config['STAGING_FOLDER']
+        worker_config = {key: config[key] for key in config
+                         if key.startswith(('FACE_', 'OPENCV_', 'STORAGE_', 'S3_'))}
+
+        try:
+            # Spawn rather than fork: the server has worker threads running, and
+            # a forked child can inherit locks (logging, connection pool, BLAS)
+            # held by them and deadlock. _init_worker builds all worker state.
+            with self.app.app_context(), ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(worker_config,),
+                mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                pending = {}
+
+                for name, open_member in iter_source_members(job.source, config['MAX_UPLOAD_FILE_SIZE']):
+                    job.found += 1
+                    original_filename = sanitize_filename(name)
+                    file_path = os.path.join(staging_folder, generate_unique_filename(original_filename))
+
+                    try:
+                        with open_member() as src, open(file_path, 'wb') as dst:
+                            shutil.copyfileobj(src, dst)
+                    except Exception as e:
+                        print(f"Error extracting {name}: {str(e)}")
+                        job.failed += 1
+                        continue
+
+                    pending[pool.submit(prepare_and_detect, file_path)] = original_filename
+
+                    if len(pending) >= self.workers * 2:
+                        self._collect(job, pending, wait(pending, return_when=FIRST_COMPLETED).done)
+                        self._report(job, on_progress)
+
+                while pending:
+                    self._collect(job, pending, wait(pending, return_when=FIRST_COMPLETED).done)
+                    self._report(job, on_progress)
+
+            job.status = 'completed'
+
+        except Exception as e:
+            print(f"Import of {job.source} failed: {str(e)}")
+            job.status = 'failed'
+            job.error = str(e)
+
+        finally:
+            job.finished = time.time()
+            self._report(job, on_progress)
+            if self.events is not None:
+                self.events.publish('batch_completed', {
+                    'processed': job.imported, 'failed': job.failed, 'faces': job.faces, 'import_id': job.id
+                })
+
+        return job
+
+    def _report(self, job, on_progress):
+        if on_progress:
+            on_progress(job)
+        if self.events is not None:
+            self.events.publish('import_progress', job.to_dict())
+
+    def _collect(self, job, pending, done):
+        """Persist and group the results of finished worker tasks"""
+        for future in done:
+            original_filename = pending.pop(future)
+            photo_id = None
+            try:
+                result = future.result()
+                if result is None:
+                    job.skipped += 1
+                    continue
+
+                attributes, face_locations, face_encodings, face_qualities = result
+                face_encodings = [np.array(encoding) for encoding in face_encodings]
+                photo, created = create_photo(original_filename, attributes)
+                db.session.commit()
+                if not created:
+                    job.duplicates += 1  # already in the library
+                    continue
+
+                photo_id = photo.id
+                if self.events is not None:
+                    self.events.publish('photos_uploaded', {'photo_ids': [photo_id]})
+
+                faces_data = self.face_processor.save_faces(photo.id, face_locations, face_encodings, face_qualities)
+                self.face_processor.group_new_faces(photo.id, faces_data)
+
+                job.imported += 1
+                job.faces += len(faces_data)
+
+                if self.events is not None:
+                    self.events.publish('photo_processed', {'photo_id': photo_id, 'ok': True, 'faces': len(faces_data)})
+                    person_ids = sorted({data['face'].person_id for data in faces_data if data['face'].person_id is not None})
+                    if person_ids:
+                        self.events.publish('album_changed', {'person_ids': person_ids, 'reason': 'faces_added'})
+
+            except Exception as e:
+                print(f"Error importing {original_filename}: {str(e)}")
+                db.session.rollback()
+                job.failed += 1
+                if photo_id is not None and self.events is not None:
+                    # The photo row exists but its faces were not saved
+                    self.events.publish('photo_processed', {'photo_id': photo_id, 'ok': False, 'faces': 0})
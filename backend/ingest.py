@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+from models import db, Photo, Face
+import stats
+from storage import hash_file, content_key
+from utils import validate_image, get_image_dimensions, get_file_size, create_thumbnail
+
+def prepare_file(file_path, storage):
+    """
+    Validate a staged image, read its dimensions, create its thumbnail and move
+    both into storage under content-addressed keys. Safe to run in a worker
+    process (no database access).
+    Returns dict of Photo attributes, or None if the file is not a valid image (it is removed).
+    """
+    if not validate_image(file_path):
+        os.remove(file_path)
+        return None
+
+    width, height = get_image_dimensions(file_path)
+    file_size = get_file_size(file_path)
+    content_hash = hash_file(file_path)
+    ext = os.path.splitext(file_path)[1].lower()
+    original_key = content_key('originals', content_hash, ext)
+    thumbnail_key = content_key('thumbnails', content_hash, ext)
+
+    thumbnail_path = f"{file_path}.thumb{ext}"
+    if create_thumbnail(file_path, thumbnail_path):
+        storage.put(thumbnail_key, thumbnail_path)
+    else:
+        thumbnail_key = None
+    storage.put(original_key, file_path)
+
+    return {
+        'filename': os.path.basename(original_key),
+        'file_path': original_key,
+        'thumbnail_key': thumbnail_key,
+        'content_hash': content_hash,
+        'file_size': file_size,
+        'width': width,
+        'height': height
+    }
+
+def create_photo(original_filename, attributes):
+    """
+    Add a Photo built from prepare_file() attributes and flush it (not committed).
+    Identical content is stored once: if a photo with the same hash exists it is
+    returned instead.
+    Returns (Photo, created)
+    """
+    existing = Photo.query.filter_by(content_hash=attributes['content_hash']).first()
+    if existing is not None:
+        return existing, False
+
+    photo = Photo(original_filename=original_filename, **attributes)
+    db.session.add(photo)
+    db.session.flush()  # Get the ID
+    stats.increment(total_photos=1, total_storage=photo.file_size or 0)
+    return photo, True
+
+def ingest_file(file_path, original_filename, storage):
+    """
+    Move a staged image into storage and register it as a Photo.
+    The photo is added and flushed but not committed.
+    Returns (Photo, created), or (None, False) if the file is not a valid image (it is removed).
+    """
+    attributes = prepare_file(file_path, storage)
+    if attributes is None:
+        return None, False
+    return create_photo(original_filename, attributes)
+
+class ProcessingQueue:
+    """
+    Long-lived background workers that run face processing for queued photos.
+    Photos are processed as soon as they are submitted, so ingest overlaps
+    with the rest of an upload; backlog() lets upload endpoints push back
+    on clients when processing falls behind.
+    """
+
+    def __init__(self, app, face_processor, storage, workers=1, events=None):
+        self.app = app
+        self.face_processor = face_processor
+        self.storage = storage
+        self.events = events
+        self._queue = queue.Queue()
+        self._threads = []
+        self._batch_lock = threading.Lock()
+        self._batch_processed = 0
+        self._batch_failed = 0
+        self._batch_faces = 0
+
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f"face-processing-{i}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, photo):
+        """Queue a photo for face processing"""
+        self._queue.put((photo.file_path, photo.id))
+
+    def backlog(self):
+        """Number of photos waiting to be processed"""
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            key, photo_id = self._queue.get()
+            ok = False
+            faces = 0
+            person_ids = []
+            try:
+                with self.app.app_context(), self.storage.open(key) as image_file:
+                    faces = self.face_processor.process_and_group_photo(image_file, photo_id)
+                    # process_photo logs and swallows its own errors; the photo is
+                    # only marked processed when its faces were saved
+                    ok = bool(db.session.query(Photo.processed).filter(Photo.id == photo_id).scalar())
+                    person_ids = [row.person_id for row in db.session.query(Face.person_id).filter(
+                        Face.photo_id == photo_id, Face.person_id.isnot(None)
+                    ).distinct()]
+                print(f"Processed photo {photo_id}")
+            except Exception as e:
+                print(f"Error processing photo {photo_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+                self._publish_progress(photo_id, ok, faces, person_ids)
+
+    def _publish_progress(self, photo_id, ok, faces, person_ids):
+        """
+        Publish a per-photo event (ok is False when processing failed and the
+        photo is still unprocessed), and a batch summary whenever the queue drains
+        """
+        if self.events is None:
+            return
+
+        backlog = self.backlog()
+        self.events.publish('photo_processed', {'photo_id': photo_id, 'ok': ok, 'faces': faces, 'backlog': backlog})
+        if person_ids:
+            self.events.publish('album_changed', {'person_ids': person_ids, 'reason': 'faces_added'})
+
+        with self._batch_lock:
+            if ok:
+                self._batch_processed += 1
+            else:
+                self._batch_failed += 1
+            self._batch_faces += faces
+            if backlog > 0:
+                return
+            summary = {'processed': self._batch_processed, 'failed': self._batch_failed, 'faces': self._batch_faces}
+            self._batch_processed = self._batch_failed = self._batch_faces = 0
+
+        self.events.publish('batch_completed', summary)
@@ -0,0 +1,39 @@
+"""
+Standalone app serving only image bytes: photos, thumbnails and downloads.
+
+Slow clients downloading albums should not tie up the workers that run the
+API and face processing, so in production this app runs on its own under
+gevent workers, where a waiting client costs a greenlet instead of a process:
+
+    gunicorn -c gunicorn_media.conf.py media_app:app
+
+It loads no face engine and starts no background workers.
+"""
+from flask import Flask, jsonify
+from flask_cors import CORS
+
+from config import Config
+from models import db
+from media import create_media_blueprint
+from storage import create_storage
+from schema import create_schema
+
+app = Flask(__name__)
+app.config.from_object(Config)
+
+CORS(app, origins=app.config['CORS_ORIGINS'])
+db.init_app(app)
+app.register_blueprint(create_media_blueprint(create_storage(app.config)))
+
+# The media tier may start before the API, so it brings the schema up to date too
+with app.app_context():
+    create_schema()
+
+@app.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'Not found'}), 404
+
+@app.errorhandler(500)
+def internal_error(error):
+    db.session.rollback()
+    return jsonify({'error': 'Internal server error'}), 500
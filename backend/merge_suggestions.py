@@ -0,0 +1,137 @@
+import threading
+import numpy as np
+from prototypes import prototype_distances
+
+class MergeSuggester:
+    """
+    Suggests duplicate persons by comparing per-person prototypes (see
+    prototypes.py): two persons are as close as their closest pair of
+    prototypes, so persons split by pose or lighting still pair up.
+    The person-by-person distance matrix is cached. The PrototypeIndex reports
+    which persons changed, and only their rows and columns are recomputed on
+    the next query.
+    """
+
+    def __init__(self, prototypes, block_size=256):
+        self.prototypes = prototypes
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._person_ids = np.empty(0, dtype=np.int64)
+        self._prototypes = None
+        self._valid = None
+        self._distances = np.empty((0, 0))
+        self._dirty = set()
+        self._stale = True
+        prototypes.add_listener(self._on_prototypes_change)
+
+    def _on_prototypes_change(self, person_ids):
+        with self._pending_lock:
+            if person_ids is None:
+                self._stale = True
+            else:
+                self._dirty.update(int(person_id) for person_id in person_ids)
+
+    def _distances_to_all(self, prototypes, valid):
+        """Distances from the given persons to every cached person, in blocks to bound memory"""
+        blocks = [
+            prototype_distances(prototypes[i:i + self.block_size], valid[i:i + self.block_size],
+                                self._prototypes, self._valid)
+            for i in range(0, len(prototypes), self.block_size)
+        ]
+        return np.vstack(blocks) if blocks else np.empty((0, len(self._person_ids)))
+
+    def _rebuild(self):
+        person_ids, prototypes, valid = self.prototypes.snapshot()
+        order = np.argsort(person_ids)
+        self._person_ids = person_ids[order]
+        if len(self._person_ids):
+            self._prototypes, self._valid = prototypes[order], valid[order]
+            self._distances = self._distances_to_all(self._prototypes, self._valid)
+        else:
+            self._prototypes = self._valid = None
+            self._distances = np.empty((0, 0))
+        np.fill_diagonal(self._distances, np.inf)
+
+    def _update(self, dirty):
+        dirty = np.array(sorted(dirty), dtype=np.int64)
+        prototypes, valid = self.prototypes.get(dirty)
+        alive = valid.any(axis=1)
+
+        # Drop persons that lost all their faces (e.g. merged away)
+        gone = np.isin(self._person_ids, dirty[~alive])
+        if gone.any():
+            keep = ~gone
+            self._person_ids = self._person_ids[keep]
+            self._prototypes = self._prototypes[keep]
+            self._valid = self._valid[keep]
+            self._distances = self._distances[keep][:, keep]
+
+        live = dirty[alive]
+        prototypes, valid = prototypes[alive], valid[alive]
+        if len(live) == 0:
+            return
+
+        # Append rows for persons seen for the first time
+        new = ~np.isin(live, self._person_ids)
+        if new.any():
+            added = int(new.sum())
+            self._person_ids = np.concatenate([self._person_ids, live[new]])
+            if self._prototypes is None:
+                self._prototypes, self._valid = prototypes[new], valid[new]
+            else:
+                self._prototypes = np.concatenate([self._prototypes, prototypes[new]])
+                self._valid = np.concatenate([self._valid, valid[new]])
+            self._distances = np.pad(self._distances, ((0, added), (0, added)), constant_values=np.inf)
+
+        order = np.argsort(self._person_ids)
+        rows = order[np.searchsorted(self._person_ids, live, sorter=order)]
+        self._prototypes[rows] = prototypes
+        self._valid[rows] = valid
+
+        row_distances = self._distances_to_all(prototypes, valid)
+        self._distances[rows, :] = row_distances
+        self._distances[:, rows] = row_distances.T
+        self._distances[rows, rows] = np.inf
+
+    def refresh(self):
+        """Bring the cached distances up to date with the prototypes (caller holds _lock)"""
+        self.prototypes.refresh()
+
+        with self._pending_lock:
+            stale, self._stale = self._stale, False
+            dirty, self._dirty = self._dirty, set()
+
+        if stale:
+            self._rebuild()
+        elif dirty:
+            self._update(dirty)
+
+    def suggest(self, limit=20, threshold=0.6):
+        """
+        Find the most similar pairs of persons
+        Returns list of (person_id_1, person_id_2, distance) sorted by distance
+        """
+        with self._lock:
+            self.refresh()
+            person_ids = self._person_ids
+            distances = self._distances.copy()
+
+        count = len(person_ids)
+        if count < 2 or limit <= 0:
+            return []
+
+        # Only look at each unordered pair once
+        distances[np.tril_indices(count)] = np.inf
+        flat = distances.ravel()
+
+        limit = min(limit, len(flat))
+        candidates = np.argpartition(flat, limit - 1)[:limit]
+        candidates = candidates[np.argsort(flat[candidates])]
+        candidates = candidates[flat[candidates] <= threshold]
+
+        rows, cols = np.unravel_index(candidates, distances.shape)
+        return [
+            (int(person_ids[i]), int(person_ids[j]), float(flat[c]))
+            for i, j, c in zip(rows, cols, candidates)
+        ]
@@ -5,10 +5,16 @@ import json
 db = SQLAlchemy()
 
 class Photo(db.Model):
+    __table_args__ = (
+        db.Index('ix_photo_upload_date_id', 'upload_date', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
-    file_path = db.Column(db.String(500), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)  # storage key (see storage.py)
+    thumbnail_key = db.Column(db.String(500))
+    content_hash = db.Column(db.String(64), unique=True, index=True)  # SHA-256 of the original
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     file_size = db.Column(db.Integer)
     width = db.Column(db.Integer)
@@ -18,8 +24,12 @@ class Photo(db.Model):
     # Relationships
     faces = db.relationship('Face', backref='photo', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, faces_count=None, fields=None):
+        """
+        Serialize the photo. Pass faces_count when it was already aggregated by the
+        query to avoid lazy-loading faces, and fields to return only those keys.
+        """
+        data = {
             'id': self.id,
             'filename': self.filename,
             'original_filename': self.original_filename,
@@ -29,8 +39,16 @@ class Photo(db.Model):
             'width': self.width,
             'height': self.height,
             'processed': self.processed,
-            'faces_count': len(self.faces)
+            'thumbnail_url': f"/api/photos/{self.id}/image?thumbnail=true"
         }
+        
+        if fields is None or 'faces_count' in fields:
+            data['faces_count'] = len(self.faces) if faces_count is None else faces_count
+        
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        
+        return data
 
 class Person(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -47,13 +65,41 @@ class Person(db.Model):
     def photo_count(self):
         return len(set(face.photo_id for face in self.faces if not self.is_merged))
     
+    @staticmethod
+    def resolve_id(person_id):
+        """
+        Follow the merged_into chain to the surviving person, compressing the
+        path so every visited person points directly at it
+        Returns the surviving person_id, or None if the person does not exist
+        """
+        person = Person.query.get(person_id)
+        chain = []
+        seen = set()
+        
+        while person and person.is_merged and person.merged_into_id and person.id not in seen:
+            seen.add(person.id)
+            chain.append(person)
+            person = Person.query.get(person.merged_into_id)
+        
+        if person is None:
+            return None
+        
+        stale = [p for p in chain if p.merged_into_id != person.id]
+        if stale:
+            for p in stale:
+                p.merged_into_id = person.id
+            db.session.commit()
+        
+        return person.id
+    
     @property
     def representative_face(self):
         """Get the best face to represent this person"""
         if not self.faces:
             return None
-        # Return the face with highest confidence or first one
-        return max(self.faces, key=lambda f: f.confidence or 0)
+        # Highest quality face (large, sharp, frontal); faces scored before
+        # quality scoring existed rank by detection confidence
+        return max(self.faces, key=lambda f: (f.quality or 0, f.confidence or 0))
     
     def to_dict(self):
         rep_face = self.representative_face
@@ -68,8 +114,8 @@ class Person(db.Model):
 
 class Face(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=False)
-    person_id = db.Column(db.Integer, db.ForeignKey('person.id'), nullable=True)
+    photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'), nullable=False, index=True)
+    person_id = db.Column(db.Integer, db.ForeignKey('person.id'), nullable=True, index=True)
     
     # Face coordinates (bounding box)
     top = db.Column(db.Integer, nullable=False)
@@ -80,6 +126,7 @@ class Face(db.Model):
     # Face encoding (stored as JSON string)
     encoding = db.Column(db.Text, nullable=False)
     confidence = db.Column(db.Float, default=0.0)
+    quality = db.Column(db.Float)  # 0-1 score from face_quality.py
     
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -105,5 +152,11 @@ class Face(db.Model):
                 'left': self.left
             },
             'confidence': self.confidence,
+            'quality': self.quality,
             'created_date': self.created_date.isoformat()
-        }
\ No newline at end of file
+        }
+
+class StatCounter(db.Model):
+    """Incrementally maintained aggregate (see stats.py)"""
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
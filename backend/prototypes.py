@@ -0,0 +1,293 @@
+import threading
+import numpy as np
+
+def pairwise_distances(a, b):
+    """Euclidean distances between rows of a and rows of b"""
+    sq = (a * a).sum(axis=1)[:, None] - 2 * (a @ b.T) + (b * b).sum(axis=1)[None, :]
+    return np.sqrt(np.maximum(sq, 0))
+
+def k_medoids(points, k, iterations=10):
+    """
+    Pick k medoids with farthest-point initialisation (so exemplars start out
+    diverse) followed by Voronoi iteration
+    Returns the medoid rows of points
+    """
+    if k <= 0:
+        return points[:0]
+    if len(points) <= k:
+        return points.copy()
+
+    distances = pairwise_distances(points, points)
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        medoids.append(int(np.argmax(distances[:, medoids].min(axis=1))))
+
+    for _ in range(iterations):
+        labels = np.argmin(distances[:, medoids], axis=1)
+        updated = []
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            if len(members) == 0:
+                updated.append(medoids[cluster])
+                continue
+            within = distances[np.ix_(members, members)].sum(axis=1)
+            updated.append(int(members[np.argmin(within)]))
+        if updated == medoids:
+            break
+        medoids = updated
+
+    return points[medoids]
+
+def prototype_distances(a, a_valid, b, b_valid):
+    """
+    Person-to-person distances: the closest pair of prototypes between each
+    person in a and each person in b
+    a, b: (persons, prototypes, dimension); a_valid, b_valid: (persons, prototypes)
+    Returns (len(a), len(b)) array
+    """
+    count_a, rows, dimension = a.shape
+    count_b = len(b)
+    flat_a = a.reshape(-1, dimension)
+    flat_b = b.reshape(-1, dimension)
+
+    sq = (flat_a * flat_a).sum(axis=1)[:, None] - 2 * (flat_a @ flat_b.T) + (flat_b * flat_b).sum(axis=1)[None, :]
+    sq[~a_valid.ravel(), :] = np.inf
+    sq[:, ~b_valid.ravel()] = np.inf
+    sq = sq.reshape(count_a, rows, count_b, rows).min(axis=(1, 3))
+    return np.sqrt(np.maximum(sq, 0))
+
+class PrototypeIndex:
+    """
+    A few prototype encodings per person (the centroid plus up to `exemplars`
+    diverse faces chosen by k-medoids), so matching a face costs one distance
+    per prototype rather than one per stored face.
+
+    Each person owns a fixed slot of rows. Faces joining a person update its
+    centroid and fill its exemplars in place. Exemplars are re-chosen from the
+    person's faces (sampled down to max_sample) on merges and removals, and
+    whenever the person has grown by regrow_factor since they were last
+    chosen. Changes arrive from the EncodingIndex and are applied on the next
+    query.
+    """
+
+    def __init__(self, index, exemplars=4, max_sample=200, regrow_factor=1.5, dtype=np.float32):
+        self.index = index
+        self.exemplars = exemplars
+        self.max_sample = max_sample
+        self.regrow_factor = regrow_factor
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._listeners = []
+        self._pending_adds = []
+        self._dirty = set()
+        self._stale = True
+        self._reset(0)
+        index.add_listener(self._on_index_change)
+
+    @property
+    def rows(self):
+        """Prototype rows per person: the centroid, then the exemplars"""
+        return self.exemplars + 1
+
+    def _reset(self, dimension):
+        self._slots = {}
+        self._free = []
+        self._slot_person = np.empty(0, dtype=np.int64)
+        self._prototypes = np.zeros((0, self.rows, dimension), dtype=self.dtype)
+        self._valid = np.zeros((0, self.rows), dtype=bool)
+        self._sq_norms = np.zeros((0, self.rows), dtype=self.dtype)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._sums = np.zeros((0, dimension), dtype=np.float64)
+        self._chosen_at = np.zeros(0, dtype=np.int64)  # face count when exemplars were last chosen
+
+    def add_listener(self, callback):
+        """
+        Register callback(person_ids) to be told whose prototypes changed;
+        person_ids is None when all of them were rebuilt
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, person_ids):
+        for callback in self._listeners:
+            callback(person_ids)
+
+    def _on_index_change(self, person_ids, added):
+        # Called with the index lock held: only record the change
+        with self._pending_lock:
+            if person_ids is None:
+                self._stale = True
+                self._pending_adds = []
+                self._dirty = set()
+            elif added is not None:
+                self._pending_adds.append((int(person_ids[0]), np.array(added, dtype=np.float64)))
+            else:
+                self._dirty.update(int(person_id) for person_id in person_ids)
+
+    def _slot_for(self, person_id, dimension):
+        slot = self._slots.get(person_id)
+        if slot is not None:
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slot_person)
+            if self._prototypes.shape[2] != dimension:
+                self._reset(dimension)
+                slot = 0
+            grow = max(len(self._slot_person), 64)
+            self._slot_person = np.concatenate([self._slot_person, np.full(grow, -1, dtype=np.int64)])
+            self._prototypes = np.concatenate([self._prototypes, np.zeros((grow, self.rows, dimension), dtype=self.dtype)])
+            self._valid = np.concatenate([self._valid, np.zeros((grow, self.rows), dtype=bool)])
+            self._sq_norms = np.concatenate([self._sq_norms, np.zeros((grow, self.rows), dtype=self.dtype)])
+            self._counts = np.concatenate([self._counts, np.zeros(grow, dtype=np.int64)])
+            self._sums = np.concatenate([self._sums, np.zeros((grow, dimension))])
+            self._chosen_at = np.concatenate([self._chosen_at, np.zeros(grow, dtype=np.int64)])
+            self._free.extend(range(len(self._slot_person) - 1, slot, -1))
+
+        self._slots[person_id] = slot
+        self._slot_person[slot] = person_id
+        return slot
+
+    def _release(self, person_id):
+        slot = self._slots.pop(person_id, None)
+        if slot is None:
+            return
+        self._slot_person[slot] = -1
+        self._valid[slot] = False
+        self._counts[slot] = 0
+        self._sums[slot] = 0
+        self._free.append(slot)
+
+    def _set_row(self, slot, row, encoding):
+        self._prototypes[slot, row] = encoding
+        self._sq_norms[slot, row] = self._prototypes[slot, row] @ self._prototypes[slot, row]
+        self._valid[slot, row] = True
+
+    def _choose(self, person_id, encodings):
+        """Recompute a person's centroid and exemplars from all of their faces"""
+        if len(encodings) == 0:
+            self._release(person_id)
+            return
+
+        slot = self._slot_for(person_id, encodings.shape[1])
+        encodings = np.asarray(encodings, dtype=np.float64)
+        self._counts[slot] = len(encodings)
+        self._sums[slot] = encodings.sum(axis=0)
+        self._chosen_at[slot] = len(encodings)
+
+        if len(encodings) > self.max_sample:
+            rng = np.random.default_rng(person_id)
+            encodings = encodings[rng.choice(len(encodings), self.max_sample, replace=False)]
+
+        self._valid[slot] = False
+        self._set_row(slot, 0, self._sums[slot] / self._counts[slot])
+        for row, exemplar in enumerate(k_medoids(encodings, self.exemplars), start=1):
+            self._set_row(slot, row, exemplar)
+
+    def _add(self, person_id, encoding):
+        """Fold one new face into a person's prototypes; returns True if exemplars need re-choosing"""
+        slot = self._slot_for(person_id, len(encoding))
+        self._counts[slot] += 1
+        self._sums[slot] += encoding
+        count = self._counts[slot]
+
+        self._set_row(slot, 0, self._sums[slot] / count)
+        if count <= self.exemplars:
+            self._set_row(slot, count, encoding)
+            self._chosen_at[slot] = count
+            return False
+        return count >= self._chosen_at[slot] * self.regrow_factor
+
+    def _rebuild(self):
+        _, _, person_ids, encodings = self.index.snapshot()
+        self._reset(encodings.shape[1])
+        if len(person_ids) == 0:
+            return
+
+        order = np.argsort(person_ids, kind='stable')
+        person_ids, encodings = person_ids[order], encodings[order]
+        unique, starts = np.unique(person_ids, return_index=True)
+        for person_id, start, end in zip(unique, starts, list(starts[1:]) + [len(person_ids)]):
+            self._choose(int(person_id), encodings[start:end])
+
+    def refresh(self):
+        """Apply the changes recorded since the last query"""
+        with self._lock, self.index.lock:
+            self.index.ensure_loaded()
+
+            with self._pending_lock:
+                stale, self._stale = self._stale, False
+                adds, self._pending_adds = self._pending_adds, []
+                dirty, self._dirty = self._dirty, set()
+
+            if stale:
+                self._rebuild()
+                changed = None
+            else:
+                for person_id, encoding in adds:
+                    if person_id not in dirty and self._add(person_id, encoding):
+                        dirty.add(person_id)
+                for person_id in dirty:
+                    self._choose(person_id, self.index.person_encodings(person_id))
+                changed = sorted(dirty | {person_id for person_id, _ in adds})
+
+        if changed is None or changed:
+            self._notify(changed)
+
+    def snapshot(self):
+        """
+        Prototypes of every person
+        Returns (person_ids, prototypes (persons, rows, dimension), valid (persons, rows))
+        """
+        self.refresh()
+        with self._lock:
+            used = self._slot_person >= 0
+            return self._slot_person[used].copy(), self._prototypes[used].copy(), self._valid[used].copy()
+
+    def get(self, person_ids):
+        """
+        Prototypes of the given persons (rows of unknown persons are all invalid)
+        Returns (prototypes (persons, rows, dimension), valid (persons, rows))
+        """
+        self.refresh()
+        with self._lock:
+            slots = np.array([self._slots.get(int(person_id), -1) for person_id in person_ids], dtype=np.int64)
+            found = slots >= 0
+            prototypes = np.zeros((len(slots), self.rows, self._prototypes.shape[2]), dtype=self.dtype)
+            valid = np.zeros((len(slots), self.rows), dtype=bool)
+            prototypes[found] = self._prototypes[slots[found]]
+            valid[found] = self._valid[slots[found]]
+            return prototypes, valid
+
+    def nearest(self, encoding, k=1, max_distance=None):
+        """
+        Find the k persons whose closest prototype is nearest to an encoding
+        Returns (person_ids, distances) sorted by distance
+        """
+        self.refresh()
+        with self._lock:
+            if not self._slots:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.dtype)
+
+            query = np.asarray(encoding, dtype=self.dtype)
+            slots, rows, dimension = self._prototypes.shape
+            sq = self._sq_norms - 2 * (self._prototypes.reshape(-1, dimension) @ query).reshape(slots, rows) + query @ query
+            sq[~self._valid] = np.inf
+            sq = sq.min(axis=1)
+
+            if k is not None and k < slots:
+                order = np.argpartition(sq, k)[:k]
+                order = order[np.argsort(sq[order])]
+            else:
+                order = np.argsort(sq)
+
+            order = order[np.isfinite(sq[order])]
+            distances = np.sqrt(np.maximum(sq[order], 0))
+
+            if max_distance is not None:
+                within = distances <= max_distance
+                order, distances = order[within], distances[within]
+
+            return self._slot_person[order], distances
@@ -0,0 +1,71 @@
+import time
+from sqlalchemy.exc import DBAPIError
+from models import db
+
+def create_schema():
+    """
+    Create missing tables, then bring tables created by older versions up to
+    date. db.create_all() never alters a table that already exists, so columns
+    and indexes added to the models since are added by upgrade_schema().
+    Call inside an app context.
+    """
+    db.create_all()
+    upgrade_schema()
+
+def upgrade_schema():
+    """
+    Add model columns and indexes missing from existing tables
+    Returns list of what was added, e.g. ['photo.content_hash', 'ix_photo_content_hash']
+    """
+    added = []
+    inspector = db.inspect(db.engine)
+
+    for table in db.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                _apply(f"{table.name}.{column.name}", lambda: _add_column(table, column),
+                       lambda: column.name in {c['name'] for c in db.inspect(db.engine).get_columns(table.name)})
+                added.append(f"{table.name}.{column.name}")
+
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                _apply(index.name, lambda: index.create(db.engine),
+                       lambda: index.name in {i['name'] for i in db.inspect(db.engine).get_indexes(table.name)})
+                added.append(index.name)
+
+    for name in added:
+        print(f"Schema upgraded: added {name}")
+    return added
+
+def _add_column(table, column):
+    if not column.nullable and column.server_default is None:
+        raise RuntimeError(f"Cannot add required column {table.name}.{column.name} without a server default")
+
+    dialect = db.engine.dialect
+    preparer = dialect.identifier_preparer
+    ddl = (f"ALTER TABLE {preparer.format_table(table)} "
+           f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=dialect)}")
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+
+    with db.engine.begin() as connection:
+        connection.execute(db.text(ddl))
+
+def _apply(name, change, done, attempts=5):
+    """
+    Run a schema change. Several processes (API and media workers) may start
+    at once and race to apply it, so a failure only counts once done() shows
+    the change is still missing after a few retries.
+    """
+    for attempt in range(attempts):
+        try:
+            change()
+            return
+        except DBAPIError:
+            if done():
+                return
+            if attempt == attempts - 1:
+                raise
+            time.sleep(1)
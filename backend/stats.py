@@ -0,0 +1,84 @@
+import threading
+from models import db, Photo, Person, Face, StatCounter
+
+COUNTERS = ('total_photos', 'processed_photos', 'total_persons', 'total_faces', 'total_storage')
+
+def compute_counters():
+    """Compute every counter from scratch with aggregate queries"""
+    return {
+        'total_photos': Photo.query.count(),
+        'processed_photos': Photo.query.filter_by(processed=True).count(),
+        'total_persons': Person.query.filter_by(is_merged=False).count(),
+        'total_faces': Face.query.count(),
+        'total_storage': int(db.session.query(db.func.sum(Photo.file_size)).scalar() or 0)
+    }
+
+def increment(**deltas):
+    """
+    Adjust counters in the current transaction, e.g. increment(total_photos=1).
+    Uses value = value + delta so concurrent workers never lose updates;
+    the change is committed together with the caller's own changes.
+    """
+    for name, delta in deltas.items():
+        if delta:
+            StatCounter.query.filter_by(name=name).update(
+                {StatCounter.value: StatCounter.value + delta}, synchronize_session=False
+            )
+
+def reconcile():
+    """
+    Reset every counter to its true value, fixing any drift
+    Returns dict of counters that were off, with their drift
+    """
+    # Lock the counters before counting, so an increment() committed by a
+    # worker is either already in the counts or waits and applies on top of
+    # the reset value, instead of being overwritten
+    if db.engine.dialect.name == 'sqlite':
+        # SQLite ignores FOR UPDATE; a write takes the database write lock
+        StatCounter.query.update({StatCounter.value: StatCounter.value}, synchronize_session=False)
+    stored = {counter.name: counter for counter in StatCounter.query.with_for_update().all()}
+    actual = compute_counters()
+    drift = {}
+
+    for name, value in actual.items():
+        counter = stored.get(name)
+        if counter is None:
+            db.session.add(StatCounter(name=name, value=value))
+        elif counter.value != value:
+            drift[name] = counter.value - value
+            counter.value = value
+
+    db.session.commit()
+    return drift
+
+def read_counters():
+    """Read all counters in one query, initializing them on first use"""
+    counters = {counter.name: counter.value for counter in StatCounter.query.all()}
+    if len(counters) < len(COUNTERS):
+        reconcile()
+        counters = {counter.name: counter.value for counter in StatCounter.query.all()}
+    return counters
+
+class StatsReconciler:
+    """Background thread that periodically reconciles the counters"""
+
+    def __init__(self, app, interval=300):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        thread = threading.Thread(target=self._run, name='stats-reconciler')
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    drift = reconcile()
+                if drift:
+                    print(f"Stats counters drifted: {drift}")
+            except Exception as e:
+                print(f"Error reconciling stats: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
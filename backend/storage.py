@@ -0,0 +1,149 @@
+import os
+import shutil
+import hashlib
+import tempfile
+
+KEY_PREFIXES = ('originals/', 'thumbnails/')
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def content_key(prefix, content_hash, ext):
+    """
+    Content-addressed key sharded by hash prefix, e.g.
+    originals/ab/cd/abcd1234...jpg, so no directory grows past a few hundred entries
+    """
+    return f"{prefix}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext.lower()}"
+
+class LocalStorage:
+    """
+    Stores objects as files under a root directory, keyed by relative path.
+    Keys that are not under a known prefix are treated as plain filesystem
+    paths, so photos stored before content addressing keep working.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        if key.startswith(KEY_PREFIXES):
+            return os.path.join(self.root, *key.split('/'))
+        return key
+
+    def put(self, key, src_path):
+        """
+        Move a local file into storage under key. Keys are content addressed,
+        so if the object already exists the copy is dropped and the existing
+        object's mtime refreshed (keeping it clear of garbage collection).
+        """
+        path = self._path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            os.remove(src_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(src_path, path)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def delete(self, key):
+        os.remove(self._path(key))
+
+    def local_path(self, key):
+        """Filesystem path of an object, for sendfile-style serving"""
+        return self._path(key)
+
+    def url(self, key, download_name=None):
+        """Direct URL for an object; local objects are served by the app instead"""
+        return None
+
+    def iter_keys(self, prefix):
+        """Yield (key, mtime, size) for every object under prefix"""
+        base = os.path.join(self.root, prefix)
+        for root, _, names in os.walk(base):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, '/')
+                yield key, stat.st_mtime, stat.st_size
+
+class S3Storage:
+    """
+    Stores objects in an S3-compatible bucket (AWS S3, MinIO, ...) with the
+    same API as LocalStorage, so originals can live off the app host.
+    Credentials come from the usual AWS environment variables. Requires boto3.
+    """
+
+    def __init__(self, bucket, endpoint_url=None, region=None, url_expiry=3600):
+        import boto3
+        self.bucket = bucket
+        self.url_expiry = url_expiry
+        self._client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+
+    def put(self, key, src_path):
+        """Upload a local file under key and remove the local copy"""
+        self._client.upload_file(src_path, self.bucket, key)
+        os.remove(src_path)
+
+    def open(self, key):
+        """
+        Download an object into a seekable temporary file (image decoders
+        need to seek); small objects stay in memory
+        """
+        f = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        self._client.download_fileobj(self.bucket, key, f)
+        f.seek(0)
+        return f
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key):
+        self._client.delete_object(Bucket=self.bucket, Key=key)
+
+    def local_path(self, key):
+        return None
+
+    def url(self, key, download_name=None):
+        """Presigned GET URL, optionally forcing a download with a file name"""
+        params = {'Bucket': self.bucket, 'Key': key}
+        if download_name:
+            params['ResponseContentDisposition'] = f'attachment; filename="{download_name}"'
+        return self._client.generate_presigned_url('get_object', Params=params, ExpiresIn=self.url_expiry)
+
+    def iter_keys(self, prefix):
+        paginator = self._client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get('Contents', []):
+                yield item['Key'], item['LastModified'].timestamp(), item['Size']
+
+def create_storage(config):
+    """Create the storage backend selected in the app config"""
+    backend = config['STORAGE_BACKEND']
+    if backend == 'local':
+        return LocalStorage(config['STORAGE_ROOT'])
+    if backend == 's3':
+        return S3Storage(
+            config['S3_BUCKET'],
+            endpoint_url=config['S3_ENDPOINT_URL'],
+            region=config['S3_REGION']
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,154 @@
+import os
+import time
+import shutil
+import threading
+from models import db, Photo
+
+def _entry_size(path):
+    """Size of a file, or of everything under a directory"""
+    if os.path.isdir(path):
+        total = 0
+        for root, _, names in os.walk(path):
+            for name in names:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _last_modified(entry):
+    """Newest mtime of an entry and, for a directory, of its direct children"""
+    mtime = entry.stat().st_mtime
+    if entry.is_dir():
+        with os.scandir(entry.path) as children:
+            for child in children:
+                mtime = max(mtime, child.stat().st_mtime)
+    return mtime
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.remove(path)
+
+class GarbageCollector:
+    """
+    Reclaims space that no Photo row refers to: stored originals and thumbnails
+    of deleted photos, files left behind by failed uploads, abandoned chunked
+    uploads and stale temporary archives. Deleting a photo only removes its
+    row; the files go on the next pass.
+
+    Files younger than min_age are never touched, so an upload that has
+    written its file but not yet committed its row is safe.
+    """
+
+    def __init__(self, app, storage, interval=3600, min_age=3600, incoming_max_age=86400,
+                 temp_max_age=3600, batch_size=500, batch_pause=0.1):
+        self.app = app
+        self.storage = storage
+        self.interval = interval
+        self.min_age = min_age
+        self.incoming_max_age = incoming_max_age
+        self.temp_max_age = temp_max_age
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='storage-gc')
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                report = self.collect()
+                if report['files_deleted']:
+                    print(f"Storage GC reclaimed {report['bytes_reclaimed']} bytes in {report['files_deleted']} files")
+            except Exception as e:
+                print(f"Error collecting garbage: {str(e)}")
+
+    def _referenced(self):
+        """
+        Storage keys referenced by photos, plus the flat file names of photos
+        stored before content addressing
+        """
+        keys = set()
+        legacy_filenames = set()
+        with self.app.app_context():
+            rows = db.session.query(Photo.filename, Photo.file_path, Photo.thumbnail_key).yield_per(5000)
+            for filename, file_path, thumbnail_key in rows:
+                keys.add(file_path)
+                if thumbnail_key:
+                    keys.add(thumbnail_key)
+                else:
+                    legacy_filenames.add(filename)
+                    keys.add(f"thumbnails/{filename}")
+        return keys, legacy_filenames
+
+    def _candidates(self, now):
+        """Yield (category, delete, size) for every entry that can be deleted"""
+        upload_folder = self.app.config['UPLOAD_FOLDER']
+        keys, legacy_filenames = self._referenced()
+
+        for category in ('originals', 'thumbnails'):
+            for key, mtime, size in self.storage.iter_keys(f"{category}/"):
+                if key not in keys and now - mtime > self.min_age:
+                    yield category, lambda key=key: self.storage.delete(key), size
+
+        # Originals uploaded before content addressing sit flat in the upload folder
+        if os.path.isdir(upload_folder):
+            with os.scandir(upload_folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name not in legacy_filenames \
+                            and now - entry.stat().st_mtime > self.min_age:
+                        yield 'originals', lambda path=entry.path: _remove(path), _entry_size(entry.path)
+
+        for category, folder, max_age in (
+            ('incoming', os.path.join(upload_folder, 'incoming'), self.incoming_max_age),
+            ('staging', self.app.config['STAGING_FOLDER'], self.min_age),
+            ('temp', self.app.config['TEMP_FOLDER'], self.temp_max_age)
+        ):
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if now - _last_modified(entry) > max_age:
+                        yield category, lambda path=entry.path: _remove(path), _entry_size(entry.path)
+
+    def collect(self):
+        """
+        Run one pass, deleting in batches with a short pause between them
+        Returns a report of deleted files and reclaimed bytes per category
+        """
+        with self._lock:
+            report = {'files_deleted': 0, 'bytes_reclaimed': 0, 'categories': {}}
+            batch = 0
+
+            for category, delete, size in self._candidates(time.time()):
+                try:
+                    delete()
+                except Exception as e:
+                    print(f"Error deleting {category} entry: {str(e)}")
+                    continue
+
+                stats = report['categories'].setdefault(category, {'files': 0, 'bytes': 0})
+                stats['files'] += 1
+                stats['bytes'] += size
+                report['files_deleted'] += 1
+                report['bytes_reclaimed'] += size
+
+                batch += 1
+                if batch >= self.batch_size:
+                    batch = 0
+                    time.sleep(self.batch_pause)
+
+            return report
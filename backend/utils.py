@@ -1,5 +1,7 @@
 import os
 import uuid
+import base64
+from datetime import datetime
 from PIL import Image
 from werkzeug.utils import secure_filename
 from config import Config
@@ -75,4 +77,18 @@ def format_file_size(size_bytes):
     while size_bytes >= 1024 and i < len(size_names) - 1:
         size_bytes /= 1024.0
         i += 1
-    return f"{size_bytes:.1f}{size_names[i]}"
\ No newline at end of file
+    return f"{size_bytes:.1f}{size_names[i]}"
+
+def encode_cursor(upload_date, photo_id):
+    """Encode a (upload_date, id) keyset position as an opaque cursor"""
+    raw = f"{upload_date.isoformat()}|{photo_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor into (upload_date, id); raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        upload_date, photo_id = raw.split('|')
+        return datetime.fromisoformat(upload_date), int(photo_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
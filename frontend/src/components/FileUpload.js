@@ -78,7 +78,7 @@ const FileUpload = ({ onUploadComplete }) => {
     try {
       const files = uploadQueue.map(item => item.file);
       
-      const response = await apiService.uploadPhotos(files, (progressEvent) => {
+      const response = await apiService.uploadPhotosChunked(files, (progressEvent) => {
         const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
         setUploadProgress(progress);
       });
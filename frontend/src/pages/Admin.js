@@ -10,20 +10,46 @@ const Admin = () => {
   const [loading, setLoading] = useState(true);
   const [reprocessing, setReprocessing] = useState(false);
   const [selectedAlbums, setSelectedAlbums] = useState([]);
+  const [mergeTargetId, setMergeTargetId] = useState(null);
+  const [suggestions, setSuggestions] = useState([]);
 
   useEffect(() => {
     fetchData();
+
+    // Keep progress live from the server's event stream instead of polling
+    const updateProgress = (stats, photosDelta, processedDelta) => {
+      if (!stats) return stats;
+      const totalPhotos = stats.total_photos + photosDelta;
+      const processedPhotos = stats.processed_photos + processedDelta;
+      return {
+        ...stats,
+        total_photos: totalPhotos,
+        processed_photos: processedPhotos,
+        processing_progress: totalPhotos > 0 ? (processedPhotos / totalPhotos) * 100 : 0
+      };
+    };
+
+    return apiService.subscribeEvents({
+      photos_uploaded: ({ photo_ids }) => setStats(prev => updateProgress(prev, photo_ids.length, 0)),
+      // Failed photos stay unprocessed, so they must not advance the progress
+      photo_processed: ({ ok }) => {
+        if (ok) setStats(prev => updateProgress(prev, 0, 1));
+      },
+      batch_completed: () => fetchData(),
+    });
   }, []);
 
   const fetchData = async () => {
     try {
-      const [statsResponse, albumsResponse] = await Promise.all([
+      const [statsResponse, albumsResponse, suggestionsResponse] = await Promise.all([
         apiService.getStats(),
-        apiService.getAlbums()
+        apiService.getAlbums(),
+        apiService.getMergeSuggestions()
       ]);
       
       setStats(statsResponse.data);
       setAlbums(albumsResponse.data.albums);
+      setSuggestions(suggestionsResponse.data.suggestions);
     } catch (error) {
       console.error('Failed to fetch admin data:', error);
       toast.error('Failed to load admin data');
@@ -52,22 +78,42 @@ const Admin = () => {
   };
 
   const handleMergeAlbums = async () => {
-    if (selectedAlbums.length !== 2) {
-      toast.error('Please select exactly 2 albums to merge');
+    if (selectedAlbums.length < 2) {
+      toast.error('Please select at least 2 albums to merge');
       return;
     }
 
-    const [album1, album2] = selectedAlbums;
-    const confirmMessage = `Merge "${album1.name}" with "${album2.name}"? This action cannot be undone.`;
+    // Merge every other selected album into the chosen target (the first selected by default)
+    const target = selectedAlbums.find(a => a.id === mergeTargetId) || selectedAlbums[0];
+    const sources = selectedAlbums.filter(a => a.id !== target.id);
+    const sourceNames = sources.map(a => `"${a.name}"`).join(', ');
+    const confirmMessage = `Merge ${sourceNames} into "${target.name}"? This action cannot be undone.`;
     
     if (!window.confirm(confirmMessage)) {
       return;
     }
 
     try {
-      await apiService.mergePersons(album1.id, album2.id);
-      toast.success(`Successfully merged albums`);
+      await apiService.mergeManyPersons(target.id, sources.map(a => a.id));
+      toast.success(`Successfully merged ${selectedAlbums.length} albums`);
       setSelectedAlbums([]);
+      setMergeTargetId(null);
+      fetchData();
+    } catch (error) {
+      console.error('Failed to merge albums:', error);
+      toast.error('Failed to merge albums');
+    }
+  };
+
+  const handleMergeSuggestion = async (suggestion) => {
+    const { person_1, person_2 } = suggestion;
+    if (!window.confirm(`Merge "${person_1.name}" with "${person_2.name}"? This action cannot be undone.`)) {
+      return;
+    }
+
+    try {
+      await apiService.mergePersons(person_1.id, person_2.id);
+      toast.success('Successfully merged albums');
       fetchData();
     } catch (error) {
       console.error('Failed to merge albums:', error);
@@ -80,12 +126,8 @@ const Admin = () => {
       const isSelected = prev.find(a => a.id === album.id);
       if (isSelected) {
         return prev.filter(a => a.id !== album.id);
-      } else if (prev.length < 2) {
-        return [...prev, album];
-      } else {
-        toast.error('You can only select 2 albums for merging');
-        return prev;
       }
+      return [...prev, album];
     });
   };
 
@@ -214,11 +256,40 @@ const Admin = () => {
         </div>
       </div>
 
+      {/* Merge Suggestions */}
+      {suggestions.length > 0 && (
+        <div className="card p-6">
+          <h3 className="text-lg font-medium text-gray-900 mb-4">Suggested Merges</h3>
+          <div className="space-y-2 max-h-96 overflow-y-auto">
+            {suggestions.map((suggestion) => (
+              <div
+                key={`${suggestion.person_1.id}-${suggestion.person_2.id}`}
+                className="flex items-center justify-between p-3 bg-gray-50 rounded-lg"
+              >
+                <div className="text-sm text-gray-900">
+                  {suggestion.person_1.name} &amp; {suggestion.person_2.name}
+                  <span className="ml-2 text-xs text-gray-500">
+                    distance {suggestion.distance.toFixed(2)}
+                  </span>
+                </div>
+                <button
+                  onClick={() => handleMergeSuggestion(suggestion)}
+                  className="btn-secondary"
+                >
+                  <Merge className="h-4 w-4 mr-2" />
+                  Merge
+                </button>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       {/* Album Management */}
       <div className="card p-6">
         <div className="flex items-center justify-between mb-4">
           <h3 className="text-lg font-medium text-gray-900">Album Management</h3>
-          {selectedAlbums.length === 2 && (
+          {selectedAlbums.length >= 2 && (
             <button
               onClick={handleMergeAlbums}
               className="btn-primary"
@@ -235,6 +306,20 @@ const Admin = () => {
               {selectedAlbums.length} album{selectedAlbums.length !== 1 ? 's' : ''} selected for merging.
               {selectedAlbums.length === 1 && ' Select one more album to merge.'}
             </p>
+            {selectedAlbums.length >= 2 && (
+              <label className="mt-2 flex items-center text-sm text-blue-800">
+                Merge into
+                <select
+                  value={(selectedAlbums.find(a => a.id === mergeTargetId) || selectedAlbums[0]).id}
+                  onChange={(e) => setMergeTargetId(Number(e.target.value))}
+                  className="ml-2 border border-blue-200 rounded px-2 py-1 text-sm"
+                >
+                  {selectedAlbums.map(album => (
+                    <option key={album.id} value={album.id}>{album.name}</option>
+                  ))}
+                </select>
+              </label>
+            )}
           </div>
         )}
 
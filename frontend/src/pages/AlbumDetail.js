@@ -11,6 +11,8 @@ const AlbumDetail = () => {
   const { personId } = useParams();
   const [album, setAlbum] = useState(null);
   const [photos, setPhotos] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [downloading, setDownloading] = useState(false);
   const [editing, setEditing] = useState(false);
@@ -25,6 +27,7 @@ const AlbumDetail = () => {
       const response = await apiService.getAlbumPhotos(personId);
       setAlbum(response.data.person);
       setPhotos(response.data.photos);
+      setNextCursor(response.data.next_cursor);
       setNewName(response.data.person.name);
     } catch (error) {
       console.error('Failed to fetch album data:', error);
@@ -34,6 +37,20 @@ const AlbumDetail = () => {
     }
   };
 
+  const fetchMorePhotos = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await apiService.getAlbumPhotos(personId, nextCursor);
+      setPhotos(prev => [...prev, ...response.data.photos]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Failed to fetch more photos:', error);
+      toast.error('Failed to load more photos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDownloadAlbum = async () => {
     if (!album) return;
 
@@ -153,7 +170,7 @@ const AlbumDetail = () => {
                 </div>
               )}
               <p className="text-gray-600">
-                {photos.length} photo{photos.length !== 1 ? 's' : ''}
+                {album.photo_count} photo{album.photo_count !== 1 ? 's' : ''}
               </p>
             </div>
           </div>
@@ -178,11 +195,24 @@ const AlbumDetail = () => {
 
       {/* Photos Grid */}
       {photos.length > 0 ? (
-        <PhotoGrid 
-          photos={photos} 
-          onPhotoDelete={handlePhotoDelete}
-          showActions={true}
-        />
+        <>
+          <PhotoGrid 
+            photos={photos} 
+            onPhotoDelete={handlePhotoDelete}
+            showActions={true}
+          />
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={fetchMorePhotos}
+                disabled={loadingMore}
+                className="btn-secondary disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {loadingMore ? 'Loading...' : 'Load More Photos'}
+              </button>
+            </div>
+          )}
+        </>
       ) : (
         <div className="text-center py-12">
           <div className="text-gray-400 mb-4">
@@ -210,7 +240,7 @@ const AlbumDetail = () => {
             <h4 className="font-medium text-gray-900 mb-2">Album Details:</h4>
             <ul className="space-y-1">
               <li>• Created: {new Date(album.created_date).toLocaleDateString()}</li>
-              <li>• Total photos: {photos.length}</li>
+              <li>• Total photos: {album.photo_count}</li>
               <li>• Faces detected: {album.representative_face ? 'Yes' : 'No'}</li>
               <li>• Album ID: {album.id}</li>
             </ul>
@@ -18,7 +18,7 @@ const Upload = () => {
 
   const fetchRecentPhotos = async () => {
     try {
-      const response = await apiService.getPhotos(1, 12);
+      const response = await apiService.getPhotos(null, 12);
       setRecentPhotos(response.data.photos);
     } catch (error) {
       console.error('Failed to fetch recent photos:', error);
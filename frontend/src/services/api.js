@@ -1,6 +1,8 @@
 import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+// Images and downloads can be served by a separate media tier (media_app.py)
+const MEDIA_BASE_URL = process.env.REACT_APP_MEDIA_URL || API_BASE_URL;
 
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -38,6 +40,36 @@ api.interceptors.response.use(
   }
 );
 
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Retry a request while the server applies backpressure (503 + Retry-After)
+const withBackpressure = async (request) => {
+  for (;;) {
+    try {
+      return await request();
+    } catch (error) {
+      if (error.response?.status !== 503) {
+        throw error;
+      }
+      const retryAfter = parseInt(error.response.headers['retry-after'], 10) || 5;
+      await sleep(retryAfter * 1000);
+    }
+  }
+};
+
+// Hex SHA-256 of an ArrayBuffer; null where Web Crypto is unavailable (plain HTTP
+// on a non-localhost origin), in which case the server skips verification
+const sha256Hex = async (buffer) => {
+  if (!window.crypto?.subtle) {
+    return null;
+  }
+  const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+// A chunk that fails its checksum was corrupted in transit; send it again
+const CHUNK_ATTEMPTS = 3;
+
 // API methods
 export const apiService = {
   // Health check
@@ -58,14 +90,66 @@ export const apiService = {
     });
   },
 
-  getPhotos: (page = 1, perPage = 20) => 
-    api.get(`/photos?page=${page}&per_page=${perPage}`),
+  // Resumable chunked upload: each file is sent in chunks and queued for
+  // processing as soon as its last chunk arrives
+  uploadPhotosChunked: async (files, onProgress) => {
+    const totalBytes = files.reduce((sum, file) => sum + file.size, 0);
+    let uploadedBytes = 0;
+    const photos = [];
+
+    for (const file of files) {
+      const { data: upload } = await withBackpressure(() =>
+        api.post('/uploads', { filename: file.name, size: file.size })
+      );
+
+      for (let index = 0; index < upload.total_chunks; index++) {
+        const chunk = await file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size).arrayBuffer();
+        const checksum = await sha256Hex(chunk);
+        const headers = { 'Content-Type': 'application/octet-stream' };
+        if (checksum) {
+          headers['X-Chunk-SHA256'] = checksum;
+        }
+
+        for (let attempt = 1; ; attempt++) {
+          try {
+            await withBackpressure(() =>
+              api.put(`/uploads/${upload.upload_id}/chunks/${index}`, chunk, { headers })
+            );
+            break;
+          } catch (error) {
+            const mismatch = error.response?.status === 400 &&
+              error.response.data?.error?.startsWith('Checksum mismatch');
+            if (!mismatch || attempt >= CHUNK_ATTEMPTS) {
+              throw error;
+            }
+          }
+        }
+        uploadedBytes += chunk.byteLength;
+        if (onProgress) {
+          onProgress({ loaded: uploadedBytes, total: totalBytes });
+        }
+      }
+
+      try {
+        const { data } = await api.post(`/uploads/${upload.upload_id}/complete`);
+        photos.push(data.photo);
+      } catch (error) {
+        // Skip files the server rejects (e.g. not a valid image)
+        console.error(`Failed to upload ${file.name}:`, error);
+      }
+    }
+
+    return { data: { photos, processing: true } };
+  },
+
+  getPhotos: (cursor = null, perPage = 20, fields = null) =>
+    api.get('/photos', { params: { cursor, per_page: perPage, fields } }),
 
   getPhotoImage: (photoId, thumbnail = false) => 
-    `${API_BASE_URL}/photos/${photoId}/image${thumbnail ? '?thumbnail=true' : ''}`,
+    `${MEDIA_BASE_URL}/photos/${photoId}/image${thumbnail ? '?thumbnail=true' : ''}`,
 
   downloadPhoto: (photoId) => 
-    api.get(`/photos/${photoId}/download`, { responseType: 'blob' }),
+    api.get(`${MEDIA_BASE_URL}/photos/${photoId}/download`, { responseType: 'blob' }),
 
   deletePhoto: (photoId) => 
     api.delete(`/admin/photos/${photoId}`),
@@ -73,11 +157,22 @@ export const apiService = {
   // Album management
   getAlbums: () => api.get('/albums'),
 
-  getAlbumPhotos: (personId) => 
-    api.get(`/albums/${personId}`),
+  getAlbumPhotos: (personId, cursor = null, perPage = 60) =>
+    api.get(`/albums/${personId}`, { params: { cursor, per_page: perPage } }),
 
   downloadAlbum: (personId) => 
-    api.get(`/albums/${personId}/download`, { responseType: 'blob' }),
+    api.get(`${MEDIA_BASE_URL}/albums/${personId}/download`, { responseType: 'blob' }),
+
+  searchByFace: (file, limit = 5) => {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    return api.post(`/search/face?limit=${limit}`, formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    });
+  },
 
   // Person management
   renamePerson: (personId, name) => 
@@ -89,10 +184,33 @@ export const apiService = {
       person_id_2: personId2 
     }),
 
+  mergeManyPersons: (targetId, sourceIds) =>
+    api.post('/admin/persons/merge', {
+      target_id: targetId,
+      source_ids: sourceIds
+    }),
+
+  getMergeSuggestions: (limit = 20) =>
+    api.get(`/admin/persons/suggestions?limit=${limit}`),
+
+  // Live updates: handlers maps event type (photo_processed, batch_completed,
+  // album_changed, ...) to a callback; returns a function that closes the stream
+  subscribeEvents: (handlers) => {
+    const source = new EventSource(`${API_BASE_URL}/events`);
+    Object.entries(handlers).forEach(([type, handler]) => {
+      source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+    });
+    return () => source.close();
+  },
+
   // Admin
   getStats: () => api.get('/admin/stats'),
 
   reprocessFaces: () => api.post('/admin/reprocess'),
+
+  startImport: (path) => api.post('/admin/import', { path }),
+
+  getImport: (jobId) => api.get(`/admin/import/${jobId}`),
 };
 
 export default api;
\ No newline at end of file